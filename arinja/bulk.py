@@ -0,0 +1,435 @@
+"""Bulk export and import of the articles table.
+
+CSV exports are written by Postgres COPY and JSONL exports are read
+through a named (server-side) cursor, in id order and a chunk at a time,
+so memory use does not grow with the table. Files ending in .gz are
+gzip-compressed, one gzip member per chunk.
+
+After every chunk the file is flushed and the position reached is saved
+next to it (``<file>.export-progress`` / ``<file>.import-progress``), so
+an interrupted run continues from the last chunk with ``resume``.
+"""
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+from contextlib import closing, contextmanager
+from typing import Callable, Dict, IO, Iterator, List, NamedTuple, Optional, Tuple
+from . import db
+from .extract import NO_CONTENT
+from .readcache import ReadCache
+
+# Columns of an export; search_vector and body_hash are derived and left out
+COLUMNS = (
+    'id', 'title', 'source', 'published_at', 'content', 'category', 'url',
+    'created_at', 'minhash', 'lsh_bands', 'cluster_id', 'fetch_status', 'http_status'
+)
+# The same, read from articles joined with article_bodies
+SELECT_COLUMNS = ', '.join('b.content' if column == 'content' else f'a.{column}' for column in COLUMNS)
+ARTICLES_FROM = "articles a LEFT JOIN article_bodies b ON b.hash = a.body_hash"
+FORMATS = ('jsonl', 'csv')
+
+# Rows per COPY, cursor fetch and progress checkpoint
+CHUNK_SIZE = 2000
+# Compresses several times faster than gzip's maximum level, for somewhat larger files
+GZIP_LEVEL = 3
+
+# Rows are copied here, then inserted into articles skipping duplicates
+STAGING_TABLE = """
+    CREATE TEMP TABLE IF NOT EXISTS article_import (
+        id INTEGER,
+        title TEXT,
+        source TEXT,
+        published_at TIMESTAMP,
+        content TEXT,
+        category TEXT,
+        url TEXT,
+        created_at TIMESTAMP,
+        minhash BIGINT[],
+        lsh_bands INTEGER[],
+        cluster_id INTEGER,
+        fetch_status TEXT,
+        http_status SMALLINT
+    );
+    -- New ids of file rows whose id another stored article already has
+    CREATE TEMP TABLE IF NOT EXISTS article_import_ids (
+        id INTEGER PRIMARY KEY,
+        new_id INTEGER NOT NULL
+    );
+"""
+
+def resolve_format(path: str, fmt: Optional[str] = None) -> Tuple[str, bool]:
+    """Get (format, gzip) for a file, taking the format from its name by default."""
+    compressed = path.endswith('.gz')
+    if fmt is None:
+        name = path[:-3] if compressed else path
+        fmt = 'csv' if name.endswith('.csv') else 'jsonl'
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', use jsonl or csv")
+    return fmt, compressed
+
+def _load_progress(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _save_progress(path: str, progress: Dict):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(progress, f)
+    os.replace(path + '.tmp', path)
+
+def _filters(
+    category: Optional[str],
+    from_date: Optional[datetime.datetime],
+    to_date: Optional[datetime.datetime]
+) -> Tuple[str, List]:
+    filters = ""
+    params: List = []
+    if category:
+        filters += " AND category = %s"
+        params.append(category)
+    if from_date:
+        filters += " AND published_at >= %s"
+        params.append(from_date)
+    if to_date:
+        filters += " AND published_at <= %s"
+        params.append(to_date)
+    return filters, params
+
+@contextmanager
+def _member(raw: IO[bytes], compressed: bool) -> Iterator[IO[bytes]]:
+    """Write one chunk, as its own gzip member when compressing."""
+    if compressed:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=GZIP_LEVEL) as out:
+            yield out
+    else:
+        yield raw
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+def _csv_chunks(conn, filters: str, params: List, last_id: int, chunk_size: int,
+                header: bool) -> Iterator[Tuple[int, int, Callable[[IO[bytes]], None]]]:
+    """Yield (last id, rows, writer) per chunk; writers COPY the rows out."""
+    with conn.cursor() as cur:
+        while True:
+            # Find the id range of the next chunk, then COPY exactly that range
+            cur.execute(f"""
+                SELECT max(id), count(*) FROM (
+                    SELECT id FROM articles WHERE id > %s{filters} ORDER BY id LIMIT %s
+                ) AS chunk
+            """, [last_id, *params, chunk_size])
+            bound, rows = cur.fetchone()
+            if bound is None:
+                return
+            copy = cur.mogrify(f"""
+                COPY (
+                    SELECT {SELECT_COLUMNS} FROM {ARTICLES_FROM}
+                    WHERE id > %s AND id <= %s{filters} ORDER BY id
+                ) TO STDOUT WITH (FORMAT csv{', HEADER' if header else ''})
+            """, [last_id, bound, *params]).decode()
+            yield bound, rows, lambda out, copy=copy: cur.copy_expert(copy, out)
+            last_id, header = bound, False
+
+def _jsonl_chunks(conn, filters: str, params: List, last_id: int,
+                  chunk_size: int) -> Iterator[Tuple[int, int, Callable[[IO[bytes]], None]]]:
+    """Yield (last id, rows, writer) per chunk read from a named cursor."""
+    with conn.cursor(name='arinja_export') as cur:
+        cur.itersize = chunk_size
+        cur.execute(f"""
+            SELECT {SELECT_COLUMNS} FROM {ARTICLES_FROM}
+            WHERE id > %s{filters} ORDER BY id
+        """, [last_id, *params])
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+
+            def write(out, rows=rows):
+                for row in rows:
+                    out.write(json.dumps(dict(zip(COLUMNS, row)), default=_json_default).encode() + b'\n')
+            yield rows[-1][0], len(rows), write
+
+def export_articles(
+    path: str,
+    fmt: Optional[str] = None,
+    category: Optional[str] = None,
+    from_date: Optional[datetime.datetime] = None,
+    to_date: Optional[datetime.datetime] = None,
+    resume: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """Write matching articles to ``path`` in id order; returns the row count.
+
+    With ``resume`` an interrupted export of the same filters continues
+    after the last finished chunk. ``on_progress`` gets the running count.
+    """
+    fmt, compressed = resolve_format(path, fmt)
+    filters, params = _filters(category, from_date, to_date)
+    settings = {
+        'format': fmt,
+        'category': category,
+        'from': from_date.isoformat() if from_date else None,
+        'to': to_date.isoformat() if to_date else None,
+    }
+    progress_path = f"{path}.export-progress"
+    progress = {'settings': settings, 'last_id': 0, 'offset': 0, 'rows': 0}
+    if resume:
+        saved = _load_progress(progress_path)
+        if saved is None:
+            raise ValueError(f"No unfinished export to resume at {path}")
+        if saved['settings'] != settings:
+            raise ValueError(f"The export at {path} was started with other options: {saved['settings']}")
+        progress = saved
+
+    with db.get_db_connection() as conn, open(path, 'r+b' if progress['offset'] else 'wb') as raw:
+        # Drop anything written after the last checkpoint
+        raw.truncate(progress['offset'])
+        raw.seek(progress['offset'])
+        if fmt == 'csv':
+            chunks = _csv_chunks(conn, filters, params, progress['last_id'], chunk_size, progress['offset'] == 0)
+        else:
+            chunks = _jsonl_chunks(conn, filters, params, progress['last_id'], chunk_size)
+
+        # Close the cursor while the connection is still ours, even on errors
+        with closing(chunks):
+            for last_id, rows, write in chunks:
+                with _member(raw, compressed) as out:
+                    write(out)
+                raw.flush()
+                os.fsync(raw.fileno())
+                progress.update(last_id=last_id, offset=raw.tell(), rows=progress['rows'] + rows)
+                _save_progress(progress_path, progress)
+                if on_progress:
+                    on_progress(progress['rows'])
+
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    return progress['rows']
+
+def _csv_records(f: IO[str]) -> Iterator[Tuple[List[str], str]]:
+    """Parse CSV records, yielding each with its raw text.
+
+    The raw text is passed on to COPY unchanged, which keeps the quoting
+    that tells NULL (empty) apart from an empty string ("").
+    """
+    lines: List[str] = []
+
+    def read():
+        for line in f:
+            lines.append(line)
+            yield line
+
+    for record in csv.reader(read()):
+        text = ''.join(lines)
+        lines.clear()
+        if record:
+            yield record, text
+
+def _csv_import_chunks(f: IO[str], chunk_size: int, skip: int) -> Iterator[Tuple[List[str], int, str]]:
+    """Yield (columns, records, CSV text) per chunk, after ``skip`` records."""
+    records = _csv_records(f)
+    header = next(records, None)
+    if header is None:
+        return
+    columns = header[0]
+    unknown = set(columns) - set(COLUMNS)
+    if unknown or 'title' not in columns:
+        raise ValueError(f"Not an arinja export: unexpected header {columns}")
+
+    chunk: List[str] = []
+    for number, (_, text) in enumerate(records):
+        if number < skip:
+            continue
+        chunk.append(text if text.endswith('\n') else text + '\n')
+        if len(chunk) == chunk_size:
+            yield columns, len(chunk), ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield columns, len(chunk), ''.join(chunk)
+
+def _csv_field(value) -> str:
+    """Format a value for COPY: NULL stays empty, text is always quoted."""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        value = '{' + ','.join(map(str, value)) + '}'
+    elif isinstance(value, int):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _jsonl_import_chunks(f: IO[str], chunk_size: int, skip: int) -> Iterator[Tuple[List[str], int, str]]:
+    """Yield (columns, records, CSV text) per chunk of JSON lines, after ``skip`` records."""
+    buffer = io.StringIO()
+    records = 0
+    number = 0
+    for line in f:
+        if not line.strip():
+            continue
+        number += 1
+        if number <= skip:
+            continue
+        article = json.loads(line)
+        buffer.write(','.join(_csv_field(article.get(column)) for column in COLUMNS) + '\n')
+        records += 1
+        if records == chunk_size:
+            yield list(COLUMNS), records, buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            records = 0
+    if records:
+        yield list(COLUMNS), records, buffer.getvalue()
+
+class ImportResult(NamedTuple):
+    """Outcome of import_articles."""
+    # New articles per category
+    inserted: Dict[str, int]
+    # Records already stored (same title, source and day), left out
+    skipped: int
+    # New articles whose id in the file was taken, stored under a new id
+    renumbered: int
+
+def import_articles(
+    path: str,
+    fmt: Optional[str] = None,
+    resume: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> ImportResult:
+    """Load an export into the articles table.
+
+    Each chunk is copied into a temporary table and inserted in its own
+    transaction. Articles already stored (same title, source and day, as
+    in store_articles) are skipped and counted, so importing a file twice
+    is harmless. Ids from the file are kept unless another article has
+    them, in which case the article gets a new id (and its cluster members
+    in the file follow it). Bodies are stored once per distinct text. With
+    ``resume`` an interrupted import skips the chunks it already
+    committed. ``on_progress`` gets the number of records read.
+    """
+    fmt, compressed = resolve_format(path, fmt)
+    progress_path = f"{path}.import-progress"
+    done = 0
+    if resume:
+        saved = _load_progress(progress_path)
+        done = saved['records'] if saved else 0
+
+    inserted: Dict[str, int] = {}
+    skipped = renumbered = 0
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f, db.get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(STAGING_TABLE)
+            chunks = (_csv_import_chunks if fmt == 'csv' else _jsonl_import_chunks)(f, chunk_size, done)
+            for columns, records, text in chunks:
+                # Staged rows outlive the commit that creates partitions
+                cur.execute("TRUNCATE article_import")
+                cur.copy_expert(
+                    f"COPY article_import ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    io.StringIO(text)
+                )
+                # Exports from before fetch statuses carry placeholder text
+                cur.execute("""
+                    UPDATE article_import SET content = NULL,
+                        fetch_status = CASE WHEN content = %s THEN 'no_content' ELSE 'error' END
+                    WHERE content = %s OR content LIKE 'Error fetching article: %%'
+                """, (NO_CONTENT, NO_CONTENT))
+                # Missing partitions are created and committed before the
+                # insert, so the table lock is not held through this chunk.
+                # Undated articles go under their creation time on a
+                # partitioned table
+                stored_at = datetime.datetime.now()
+                cur.execute(
+                    "SELECT DISTINCT date_trunc('month', COALESCE(published_at, created_at, %s)) FROM article_import",
+                    (stored_at,)
+                )
+                partitioned = db.ensure_partitions(conn, [row[0] for row in cur.fetchall()])
+                published_at = 'COALESCE({t}published_at, {t}created_at, %(stored_at)s)' if partitioned else '{t}published_at'
+                # Rows whose id already holds the same article were imported
+                # before; other stored articles with the file's id are not
+                same_article = f"""
+                    (a.title, a.source, a.published_at::date)
+                    IS NOT DISTINCT FROM (i.title, i.source, ({published_at.format(t='i.')})::date)
+                """
+                params = {'stored_at': stored_at}
+                # Move the sequence past the file's ids before anything else
+                # can take them, then renumber ids taken by other articles
+                cur.execute("""
+                    SELECT setval(seq, top) FROM (
+                        SELECT pg_get_serial_sequence('articles', 'id')::regclass AS seq,
+                               (SELECT max(id) FROM article_import) AS top
+                    ) AS s
+                    WHERE top > COALESCE(pg_sequence_last_value(seq), 0)
+                """)
+                cur.execute(f"""
+                    INSERT INTO article_import_ids (id, new_id)
+                    SELECT id, nextval(pg_get_serial_sequence('articles', 'id')) FROM (
+                        SELECT DISTINCT i.id FROM article_import i JOIN articles a ON a.id = i.id
+                        WHERE NOT {same_article}
+                    ) AS taken
+                    ON CONFLICT (id) DO UPDATE SET new_id = EXCLUDED.new_id
+                """, params)
+                # As in db._store_batch, only the dedup key may be skipped
+                # silently, except on a partitioned table
+                conflict = "" if partitioned else "(title, source, (published_at::date))"
+                cur.execute(f"""
+                    WITH staged AS (
+                        SELECT i.*, sha256(convert_to(i.content, 'UTF8')) AS body_hash,
+                               COALESCE(r.new_id, i.id, nextval(pg_get_serial_sequence('articles', 'id'))) AS article_id,
+                               COALESCE(c.new_id, i.cluster_id) AS article_cluster_id
+                        FROM article_import i
+                        LEFT JOIN article_import_ids r ON r.id = i.id
+                        LEFT JOIN article_import_ids c ON c.id = i.cluster_id
+                        WHERE NOT EXISTS (SELECT 1 FROM articles a WHERE a.id = i.id AND {same_article})
+                    ), inserted AS (
+                        INSERT INTO articles (
+                            id, title, source, published_at, category, url, created_at, minhash,
+                            lsh_bands, cluster_id, fetch_status, http_status, body_hash, search_vector
+                        )
+                        SELECT article_id, title, source, {published_at.format(t='')}, category, url,
+                               COALESCE(created_at, CURRENT_TIMESTAMP), minhash, lsh_bands, article_cluster_id,
+                               COALESCE(fetch_status, 'ok'), http_status, body_hash,
+                               {db.SEARCH_VECTOR.format(title='title', content='content')}
+                        FROM staged
+                        ORDER BY article_id
+                        ON CONFLICT {conflict} DO NOTHING
+                        RETURNING id, category, body_hash
+                    ), bodies AS (
+                        INSERT INTO article_bodies (hash, content)
+                        SELECT DISTINCT ON (body_hash) body_hash, content FROM staged
+                        WHERE body_hash IN (SELECT body_hash FROM inserted)
+                        ON CONFLICT DO NOTHING
+                    )
+                    SELECT category, count(*),
+                           count(*) FILTER (WHERE id IN (SELECT new_id FROM article_import_ids))
+                    FROM inserted GROUP BY category
+                """, params)
+                counts = cur.fetchall()
+                for category, count, new_ids in counts:
+                    inserted[category] = inserted.get(category, 0) + count
+                    renumbered += new_ids
+                skipped += records - sum(count for _, count, _ in counts)
+                if counts:
+                    db.notify_articles_changed(cur, [category for category, _, _ in counts])
+                conn.commit()
+                done += records
+                _save_progress(progress_path, {'records': done})
+                if on_progress:
+                    on_progress(done)
+
+    if inserted:
+        reads = ReadCache()
+        try:
+            reads.invalidate_listings(list(inserted))
+        finally:
+            reads.close()
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    return ImportResult(inserted, skipped, renumbered)
@@ -1,37 +1,85 @@
 """CLI interface for arinja."""
 
 import typer
-import webbrowser
 import datetime
+import json
+import os
+import re
+import time
+from typer.core import TyperGroup
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from typing import Optional, Union
-from . import news, db
+from typing import Dict, List, Optional
+from . import paging
+from .readcache import ReadCache
 
-app = typer.Typer(help="Arinja: AI-powered terminal news bot.", add_completion=False)
+# Read commands are run often, so the fetch stack (gnews, requests, bs4)
+# and the database driver are imported only by the commands that use them
+
+
+class ArinjaGroup(TyperGroup):
+    """Command group that lets subcommands coexist with `arinja <target>`."""
+
+    def parse_args(self, ctx, args):
+        # Without this the optional target argument swallows the subcommand
+        # name; global flags such as --offline may come before it
+        name = next((i for i, arg in enumerate(args) if not arg.startswith('-')), None)
+        if name is not None and args[name] in self.commands:
+            super().parse_args(ctx, args[:name])
+            ctx.protected_args, ctx.args = args[name:name + 1], args[name + 1:]
+            return ctx.args
+        # Let listing options follow the target, as in `arinja sports -n 5`
+        ctx.allow_interspersed_args = True
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(cls=ArinjaGroup, help="Arinja: AI-powered terminal news bot.", add_completion=False)
 console = Console()
+# Global options, set by the main callback
+state = {'offline': False}
 
 CATEGORIES = ['technology', 'business', 'sports', 'entertainment', 
              'science', 'health', 'world', 'india']
 
+# Fetch option defaults. These mirror news, web, extract and pipeline so
+# that showing them does not import those modules; tests keep them in sync.
+DEFAULT_JOBS = len(CATEGORIES)
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 2
+DEFAULT_EXTRACT_PROCS = os.cpu_count() or 1
+DEFAULT_PARSER = 'html.parser'
+DEFAULT_MAX_PAGE_KB = 2048
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_WINDOW_DAYS = 1
+# Seconds between polls of `arinja watch`
+DEFAULT_WATCH_INTERVAL = 600
+
+# India Standard Time for the welcome screen, without loading pytz
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
 def show_welcome():
     """Show welcome message with available commands."""
     console.print(Panel(
         "[bold green]Welcome to Arinja![/bold green]\n\n"
         "Your personal AI-powered news assistant.\n"
-        f"Current time (IST): {news.get_current_ist_time().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        f"Current time (IST): {datetime.datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')}\n\n"
         "[bold]Available Categories:[/bold]\n"
         "🔧 [cyan]technology[/cyan]  💼 [cyan]business[/cyan]  ⚽ [cyan]sports[/cyan]\n"
         "🎬 [cyan]entertainment[/cyan]  🔬 [cyan]science[/cyan]  🏥 [cyan]health[/cyan]\n"
         "🌍 [cyan]world[/cyan]  🇮🇳 [cyan]india[/cyan]\n\n"
         "[dim]Commands:[/dim]\n"
-        "[dim]• arinja <category> - Show headlines for category[/dim]\n"
+        "[dim]• arinja <category> [--limit N] [--before CURSOR] [-u] - Show headlines for category[/dim]\n"
         "[dim]• arinja <id> - Show full article[/dim]\n"
         "[dim]• arinja fetch [--from YYYY-MM-DD] [--to YYYY-MM-DD] - Update news database[/dim]\n"
+        "[dim]• arinja watch [--interval SECONDS] - Keep the database updated[/dim]\n"
+        "[dim]• arinja search <query> - Search article text[/dim]\n"
+        "[dim]• arinja export <file> / arinja import <file> - Dump or load articles (JSONL/CSV)[/dim]\n"
+        "[dim]• arinja prune --older-than 6m - Delete old articles[/dim]\n"
+        "[dim]• arinja serve [--port PORT] - Serve articles as a local JSON API[/dim]\n"
         "[dim]• arinja source <id> - Show article source[/dim]\n"
-        "[dim]• arinja open <id> - Open article in browser[/dim]",
+        "[dim]• arinja open <id> - Open article in browser[/dim]\n"
+        "[dim]• arinja --offline ... - Read from the local cache only[/dim]",
         title="[green]arinja[/green]",
         border_style="green"
     ))
@@ -40,8 +88,17 @@ def show_welcome():
 def main(
     ctx: typer.Context,
     target: str = typer.Argument(None, help="Category name or article ID"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Headlines per page"),
+    before: str = typer.Option(None, "--before", help="Show the page after this cursor"),
+    collapse: bool = typer.Option(False, "--collapse-duplicates", "-u", help="List each story once, however many sources carried it"),
+    offline: bool = typer.Option(False, "--offline", help="Read only from the local cache, never the database")
 ):
     """Arinja news bot - show headlines by category or article by ID."""
+    state['offline'] = offline
+    if offline and ctx.invoked_subcommand in ('fetch', 'watch', 'search', 'export', 'import', 'prune', 'serve'):
+        console.print(f"[red]Error: '{ctx.invoked_subcommand}' needs the database and cannot run --offline[/red]")
+        raise typer.Exit(1)
+    
     if not ctx.invoked_subcommand:
         if target is None:
             show_welcome()
@@ -57,7 +114,13 @@ def main(
 
         # Handle category
         if target.lower() in CATEGORIES:
-            show_category_news(target.lower())
+            if before:
+                try:
+                    paging.parse_cursor(before)
+                except ValueError:
+                    console.print(f"[red]Error: Invalid cursor '{before}'[/red]")
+                    raise typer.Exit(1)
+            show_category_news(target.lower(), limit=limit, before=before, collapse=collapse)
         else:
             console.print(Panel(
                 "Invalid category. Available categories:\n"
@@ -71,38 +134,242 @@ def main(
 @app.command()
 def fetch(
     from_date: str = typer.Option(None, "--from", help="Start date (YYYY-MM-DD)"),
-    to_date: str = typer.Option(None, "--to", help="End date (YYYY-MM-DD)")
+    to_date: str = typer.Option(None, "--to", help="End date (YYYY-MM-DD)"),
+    workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Concurrent article downloads"),
+    per_host: int = typer.Option(DEFAULT_PER_HOST, "--per-host", min=1, help="Concurrent downloads per publisher"),
+    jobs: int = typer.Option(DEFAULT_JOBS, "--jobs", "-j", min=1, help="Categories (or backfill windows) fetched in parallel"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Skip the local page cache"),
+    refresh: bool = typer.Option(False, "--refresh", help="Revalidate every cached page"),
+    extract_procs: int = typer.Option(DEFAULT_EXTRACT_PROCS, "--extract-procs", min=0, help="Processes parsing article HTML (0 or 1 parses in download threads)"),
+    parser: str = typer.Option(DEFAULT_PARSER, "--parser", help="HTML parser: html.parser, lxml or auto"),
+    max_page_kb: int = typer.Option(DEFAULT_MAX_PAGE_KB, "--max-page-kb", min=1, help="Download at most this much of each article page"),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, "--chunk-size", min=1, help="Articles stored per commit"),
+    backfill: bool = typer.Option(False, "--backfill", help="Fetch the range window by window, resuming from checkpoints"),
+    window_days: int = typer.Option(DEFAULT_WINDOW_DAYS, "--window-days", min=1, help="Days per backfill window"),
+    full: bool = typer.Option(False, "--full", help="Ignore watermarks and re-scan the last 7 days"),
+    metrics_format: str = typer.Option(None, "--metrics", help="Print run metrics to stdout: json or prometheus"),
+    prometheus_file: str = typer.Option(None, "--prometheus-file", help="Write run metrics to this Prometheus textfile"),
+    profile: str = typer.Option(None, "--profile", help="Write a cProfile dump of the run to this file")
 ):
     """Fetch and index latest news."""
+    from . import pipeline
+    from .extract import resolve_parser
+    from .metrics import Metrics, profile_run
+    
+    if metrics_format not in (None, 'json', 'prometheus'):
+        console.print("[red]Error: --metrics must be json or prometheus[/red]")
+        raise typer.Exit(1)
     try:
-        # Parse dates if provided
-        start_date = None
-        end_date = None
-        
-        if from_date:
-            start_date = datetime.datetime.strptime(from_date, "%Y-%m-%d").date()
-        if to_date:
-            end_date = datetime.datetime.strptime(to_date, "%Y-%m-%d").date()
-        
-        # Validate date range
-        if start_date and end_date and end_date < start_date:
-            console.print("[red]Error: End date cannot be before start date[/red]")
-            raise typer.Exit(1)
-        
-        # Check if dates are in the future
-        today = datetime.datetime.now().date()
-        if (start_date and start_date > today) or (end_date and end_date > today):
-            console.print("[red]Error: Dates cannot be in the future[/red]")
-            raise typer.Exit(1)
-            
-        _fetch(from_date=start_date, to_date=end_date)
-        
+        resolve_parser(parser)
     except ValueError as e:
+        console.print(f"[red]Error: {escape(str(e))}[/red]")
+        raise typer.Exit(1)
+    if metrics_format:
+        # Keep stdout for the metrics document
+        console.stderr = pipeline.console.stderr = True
+    
+    # Parse dates if provided
+    try:
+        start_date = datetime.datetime.strptime(from_date, "%Y-%m-%d").date() if from_date else None
+        end_date = datetime.datetime.strptime(to_date, "%Y-%m-%d").date() if to_date else None
+    except ValueError:
         console.print("[red]Error: Invalid date format. Use YYYY-MM-DD[/red]")
         raise typer.Exit(1)
+    
+    # Validate date range
+    if start_date and end_date and end_date < start_date:
+        console.print("[red]Error: End date cannot be before start date[/red]")
+        raise typer.Exit(1)
+    
+    # Check if dates are in the future
+    today = datetime.datetime.now().date()
+    if (start_date and start_date > today) or (end_date and end_date > today):
+        console.print("[red]Error: Dates cannot be in the future[/red]")
+        raise typer.Exit(1)
+    
+    if backfill and not start_date:
+        console.print("[red]Error: --backfill needs a --from date[/red]")
+        raise typer.Exit(1)
+    
+    try:
+        metrics = Metrics()
+        with profile_run(profile):
+            pipeline.fetch(CATEGORIES, from_date=start_date, to_date=end_date, workers=workers,
+                           per_host=per_host, jobs=jobs, use_cache=not no_cache, refresh=refresh,
+                           extract_procs=extract_procs, parser=parser, max_page_bytes=max_page_kb * 1024,
+                           chunk_size=chunk_size, backfill=backfill, window_days=window_days, full=full,
+                           metrics=metrics)
+        
+        if prometheus_file:
+            metrics.write_prometheus(prometheus_file)
+        if metrics_format == 'json':
+            print(json.dumps(metrics.snapshot(), indent=2))
+        elif metrics_format == 'prometheus':
+            print(metrics.to_prometheus(), end='')
+        
     except Exception as e:
-        console.print(f"[red]Error: {str(e)}[/red]")
+        console.print(f"[red]Error: {escape(str(e))}[/red]")
+        raise typer.Exit(1)
+
+@app.command()
+def watch(
+    interval: int = typer.Option(DEFAULT_WATCH_INTERVAL, "--interval", min=1, help="Seconds between polls"),
+    workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Concurrent article downloads"),
+    per_host: int = typer.Option(DEFAULT_PER_HOST, "--per-host", min=1, help="Concurrent downloads per publisher"),
+    jobs: int = typer.Option(DEFAULT_JOBS, "--jobs", "-j", min=1, help="Categories fetched in parallel"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Skip the local page cache"),
+    extract_procs: int = typer.Option(DEFAULT_EXTRACT_PROCS, "--extract-procs", min=0, help="Processes parsing article HTML (0 or 1 parses in download threads)"),
+    parser: str = typer.Option(DEFAULT_PARSER, "--parser", help="HTML parser: html.parser, lxml or auto"),
+    max_page_kb: int = typer.Option(DEFAULT_MAX_PAGE_KB, "--max-page-kb", min=1, help="Download at most this much of each article page"),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, "--chunk-size", min=1, help="Articles stored per commit"),
+    prometheus_file: str = typer.Option(None, "--prometheus-file", help="Rewrite this Prometheus textfile after each poll")
+):
+    """Keep fetching new articles on a schedule until interrupted."""
+    from . import db, pipeline
+    
+    # HTTP connections, page cache, extraction workers and the DB pool
+    # stay open across polls
+    try:
+        resources = pipeline.open_resources(per_host=per_host, max_page_bytes=max_page_kb * 1024,
+                                    use_cache=not no_cache, extract_procs=extract_procs, parser=parser)
+    except ValueError as e:
+        console.print(f"[red]Error: {escape(str(e))}[/red]")
+        raise typer.Exit(1)
+    try:
+        while True:
+            started = time.monotonic()
+            # Circuit breakers and counters apply per poll
+            resources.client.reset()
+            try:
+                metrics = pipeline.fetch(CATEGORIES, workers=workers, jobs=jobs, chunk_size=chunk_size,
+                                         resources=resources)
+                if prometheus_file:
+                    metrics.write_prometheus(prometheus_file)
+            except Exception as e:
+                console.print(f"[red]Error: {str(e)}[/red]")
+            if resources.cache:
+                resources.cache.evict()
+            
+            delay = max(0.0, interval - (time.monotonic() - started))
+            console.print(f"[dim]Next check in {delay:.0f}s (Ctrl+C to stop)[/dim]")
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        console.print("[green]Stopped watching.[/green]")
+    finally:
+        pipeline.close_resources(resources)
+        db.close_pool()
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Search terms; supports \"phrases\", -exclude and or"),
+    category: str = typer.Option(None, "--category", "-c", help="Only search this category"),
+    from_date: str = typer.Option(None, "--from", help="Start date (YYYY-MM-DD)"),
+    to_date: str = typer.Option(None, "--to", help="End date (YYYY-MM-DD)"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum results")
+):
+    """Search article titles and content."""
+    start, end = _parse_date_range(from_date, to_date)
+    show_search_results(query, _parse_category(category), start, end, limit)
+
+@app.command(name="export")
+def export_articles(
+    path: str = typer.Argument(..., help="Output file, .jsonl or .csv; add .gz to compress"),
+    category: str = typer.Option(None, "--category", "-c", help="Only export this category"),
+    from_date: str = typer.Option(None, "--from", help="Start date (YYYY-MM-DD)"),
+    to_date: str = typer.Option(None, "--to", help="End date (YYYY-MM-DD)"),
+    fmt: str = typer.Option(None, "--format", help="jsonl or csv (default: from the file name)"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted export")
+):
+    """Export articles to a JSONL or CSV file."""
+    from . import bulk
+    
+    start, end = _parse_date_range(from_date, to_date)
+    try:
+        with console.status("Exporting articles...") as status:
+            count = bulk.export_articles(
+                path, fmt, _parse_category(category), start, end, resume=resume,
+                on_progress=lambda rows: status.update(f"Exported {rows} articles...")
+            )
+    except (ValueError, OSError) as e:
+        console.print(f"[red]Error: {escape(str(e))}[/red]")
+        raise typer.Exit(1)
+    console.print(f"[green]✓ Exported {count} articles to {escape(path)}[/green]")
+
+@app.command(name="import")
+def import_articles(
+    path: str = typer.Argument(..., help="File written by arinja export"),
+    fmt: str = typer.Option(None, "--format", help="jsonl or csv (default: from the file name)"),
+    resume: bool = typer.Option(False, "--resume", help="Skip records an interrupted import already committed")
+):
+    """Import articles from a JSONL or CSV export."""
+    from . import bulk
+    
+    try:
+        with console.status("Importing articles...") as status:
+            result = bulk.import_articles(
+                path, fmt, resume=resume,
+                on_progress=lambda records: status.update(f"Read {records} records...")
+            )
+    except (ValueError, OSError) as e:
+        console.print(f"[red]Error: {escape(str(e))}[/red]")
         raise typer.Exit(1)
+    
+    console.print(f"[green]✓ Imported {sum(result.inserted.values())} new articles[/green]")
+    for category, count in sorted(result.inserted.items()):
+        console.print(f"  {category}: {count}")
+    if result.skipped:
+        console.print(f"[yellow]Skipped {result.skipped} articles that were already stored[/yellow]")
+    if result.renumbered:
+        console.print(f"[dim]{result.renumbered} articles got new ids; theirs were taken[/dim]")
+
+@app.command()
+def prune(
+    older_than: str = typer.Option(..., "--older-than", help="Age of articles to delete, e.g. 90d, 12w, 6m or 1y"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Don't ask for confirmation")
+):
+    """Delete old articles, a whole month at a time."""
+    from . import db
+    
+    before = _parse_age(older_than)
+    cutoff = datetime.datetime(before.year, before.month, 1)
+    if not yes and not typer.confirm(f"Delete all articles published before {cutoff:%Y-%m-%d}?"):
+        raise typer.Exit(1)
+    
+    with console.status("Pruning articles..."):
+        removed = db.prune_articles(cutoff)
+        reads = _get_read_cache()
+        reads.invalidate_listings(CATEGORIES)
+        reads.forget_articles(cutoff)
+    
+    console.print(
+        f"[green]✓ Deleted {removed['articles']} articles published before {cutoff:%Y-%m-%d}[/green]"
+        f"[dim] ({removed['partitions']} partitions, {removed['bodies']} bodies)[/dim]"
+    )
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(None, "--port", "-p", min=0, help="Port to listen on (default: ARINJA_SERVE_PORT or 8080)"),
+    cache_seconds: float = typer.Option(None, "--cache-seconds", min=0, help="Seconds a listing stays cached (default: ARINJA_SERVE_CACHE_SECONDS or 300)"),
+    cache_entries: int = typer.Option(None, "--cache-entries", min=1, help="Listing pages kept in memory (default: ARINJA_SERVE_CACHE_ENTRIES or 1024)")
+):
+    """Serve articles as a local HTTP/JSON API until interrupted."""
+    from . import server
+    
+    try:
+        api = server.start(CATEGORIES, host=host, port=port, cache_seconds=cache_seconds,
+                           cache_entries=cache_entries)
+    except OSError as e:
+        console.print(f"[red]Error: Cannot listen on {escape(host)}: {escape(str(e))}[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"[green]Serving articles on http://{host}:{api.server_port}[/green] [dim](Ctrl+C to stop)[/dim]")
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[green]Stopped serving.[/green]")
+    finally:
+        api.close()
 
 @app.command()
 def source(
@@ -118,36 +385,77 @@ def open(
     """Open article in web browser."""
     open_article(article_id)
 
-def _fetch(from_date: Optional[datetime.date] = None, to_date: Optional[datetime.date] = None):
-    """Fetch and index latest news."""
-    source = news.NewsSource(start_date=from_date, end_date=to_date)
-    
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
-        articles = []
-        date_range = f" ({from_date} to {to_date})" if from_date and to_date else ""
-        task = progress.add_task(f"Fetching news{date_range}...", total=None)
-        
-        for category in CATEGORIES:
-            progress.update(task, description=f"Fetching {category} news...")
-            cat_articles = source.fetch_headlines(category)
-            articles.extend(cat_articles)
-        
-        progress.update(task, description="Storing articles...")
-        article_ids = db.store_articles(articles)
-    
-    console.print(Panel(
-        f"✓ Fetched {len(articles)} articles\n"
-        f"✓ New/updated articles: {len(article_ids)}",
-        title="[green]Update Complete[/green]",
-        border_style="green"
-    ))
+def _parse_date_range(from_date: Optional[str], to_date: Optional[str]):
+    """Parse --from/--to dates; the range includes the whole end day."""
+    try:
+        start = datetime.datetime.strptime(from_date, "%Y-%m-%d") if from_date else None
+        end = datetime.datetime.strptime(to_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59) if to_date else None
+    except ValueError:
+        console.print("[red]Error: Invalid date format. Use YYYY-MM-DD[/red]")
+        raise typer.Exit(1)
+    return start, end
 
-def show_category_news(category: str):
-    """Show headlines for a specific category."""
-    articles = db.get_articles(category=category.lower())
+AGE = re.compile(r'(\d+)([dwmy])')
+
+def _parse_age(age: str) -> datetime.datetime:
+    """Turn an age like 90d, 12w, 6m or 1y into the time that long ago."""
+    match = AGE.fullmatch(age.strip().lower())
+    if not match:
+        console.print(f"[red]Error: Invalid age '{escape(age)}'. Use a number followed by d, w, m or y[/red]")
+        raise typer.Exit(1)
+    count, unit = int(match.group(1)), match.group(2)
+    now = datetime.datetime.now()
+    if unit in ('d', 'w'):
+        return now - datetime.timedelta(days=count * (7 if unit == 'w' else 1))
+    months = now.year * 12 + now.month - 1 - count * (12 if unit == 'y' else 1)
+    return datetime.datetime(months // 12, months % 12 + 1, 1)
+
+def _parse_category(category: Optional[str]) -> Optional[str]:
+    """Validate a --category option."""
+    if category and category.lower() not in CATEGORIES:
+        console.print(f"[red]Error: Unknown category '{category}'. Choose from: {', '.join(CATEGORIES)}[/red]")
+        raise typer.Exit(1)
+    return category.lower() if category else None
+
+_read_cache: Optional[ReadCache] = None
+
+def _get_read_cache() -> ReadCache:
+    """Get the local read cache, opening it on first use."""
+    global _read_cache
+    if _read_cache is None:
+        _read_cache = ReadCache()
+    return _read_cache
+
+def _not_found(message: str) -> str:
+    return f"{message} in the local cache" if state['offline'] else message
+
+def _load_article(article_id: int) -> Optional[Dict]:
+    """Get an article from the local cache, falling back to the database."""
+    reads = _get_read_cache()
+    article = reads.get_article(article_id)
+    if article is None and not state['offline']:
+        from . import db
+        article = db.get_article_by_id(article_id)
+        if article:
+            reads.put_articles([article])
+    return article
+
+def _load_listing(category: str, limit: int, before: Optional[str], collapse: bool = False) -> List[Dict]:
+    """Get a listing page from the local cache, falling back to the database."""
+    reads = _get_read_cache()
+    articles = reads.get_listing(category, limit, before, stale_ok=state['offline'], collapse=collapse)
+    if articles is None and not state['offline']:
+        from . import db
+        articles = db.get_articles(category=category, limit=limit, before=before, collapse=collapse)
+        reads.put_listing(category, limit, before, articles, collapse=collapse)
+    return articles or []
+
+def show_category_news(category: str, limit: int = 20, before: Optional[str] = None, collapse: bool = False):
+    """Show a page of headlines for a specific category."""
+    articles = _load_listing(category.lower(), limit, before, collapse)
     if not articles:
         console.print(Panel(
-            f"No articles found for category: {category}",
+            _not_found(f"No articles found for category: {category}"),
             border_style="red"
         ))
         return
@@ -161,15 +469,51 @@ def show_category_news(category: str):
     console.print(f"\n[bold green]{icon} {category.upper()}[/bold green]")
     for article in articles:
         date = article['published_at'].strftime('%Y-%m-%d') if article.get('published_at') else ''
-        console.print(f"[white]#{article['id']} {date} | {article['title']}[/white]")
+        duplicates = article.get('duplicates')
+        more = f" [dim](+{duplicates} more)[/dim]" if duplicates else ""
+        console.print(f"[white]#{article['id']} {date} | {article['title']}[/white]{more}")
+    
+    console.print("\n[dim]Use 'arinja <id>' to see article content[/dim]")
+    if len(articles) == limit:
+        flags = " --collapse-duplicates" if collapse else ""
+        console.print(f"[dim]More: arinja {category.lower()}{flags} --before {paging.make_cursor(articles[-1])}[/dim]")
+
+def show_search_results(
+    query: str,
+    category: Optional[str] = None,
+    from_date: Optional[datetime.datetime] = None,
+    to_date: Optional[datetime.datetime] = None,
+    limit: int = 20
+):
+    """Show ranked search results with highlighted snippets."""
+    from . import db
+    
+    articles = db.search_articles(query, category=category, from_date=from_date, to_date=to_date, limit=limit)
+    if not articles:
+        console.print(Panel(
+            f"No articles found for: {query}",
+            border_style="red"
+        ))
+        return
+    
+    console.print(f"\n[bold green]🔍 {escape(query)}[/bold green]")
+    for article in articles:
+        date = article['published_at'].strftime('%Y-%m-%d') if article.get('published_at') else ''
+        snippet = (
+            escape(' '.join(article['snippet'].split()))
+            .replace(db.HIGHLIGHT_START, '[bold yellow]')
+            .replace(db.HIGHLIGHT_STOP, '[/bold yellow]')
+        )
+        console.print(f"[white]#{article['id']} {date} | {escape(article['title'])}[/white] [dim]({article['category']})[/dim]")
+        console.print(f"    [dim]{snippet}[/dim]")
     
     console.print("\n[dim]Use 'arinja <id>' to see article content[/dim]")
 
 def show_source(id: int):
     """Show article source and URL."""
-    article = db.get_article_by_id(id)
+    article = _load_article(id)
     if not article:
-        console.print(Panel(f"Article {id} not found", border_style="red"))
+        console.print(Panel(_not_found(f"Article {id} not found"), border_style="red"))
         return
     
     console.print(Panel(
@@ -181,9 +525,11 @@ def show_source(id: int):
 
 def open_article(id: int):
     """Open article URL in default web browser."""
-    article = db.get_article_by_id(id)
+    import webbrowser
+    
+    article = _load_article(id)
     if not article:
-        console.print(Panel(f"Article {id} not found", border_style="red"))
+        console.print(Panel(_not_found(f"Article {id} not found"), border_style="red"))
         return
     
     try:
@@ -200,11 +546,29 @@ def open_article(id: int):
             border_style="red"
         ))
 
+# Why an article has no body, by fetch status (see news.FetchResult)
+FETCH_STATUS_REASONS = {
+    'no_content': "no article text was found on the page",
+    'http_error': "the publisher answered with HTTP {http_status}",
+    'timeout': "the download timed out",
+    'connection_error': "the publisher's site could not be reached",
+    'host_skipped': "the site was skipped after repeated failures",
+    'unsupported': "the link is not an HTML page",
+}
+
+def _missing_content(article: Dict) -> str:
+    """Explain why an article has no content."""
+    reason = FETCH_STATUS_REASONS.get(article.get('fetch_status'), "the download failed")
+    return (
+        f"[yellow]Article content could not be retrieved: "
+        f"{reason.format(http_status=article.get('http_status'))}. Please check the source URL.[/yellow]"
+    )
+
 def show_article(id: int):
     """Show full article content."""
-    article = db.get_article_by_id(id)
+    article = _load_article(id)
     if not article:
-        console.print(Panel(f"Article {id} not found", border_style="red"))
+        console.print(Panel(_not_found(f"Article {id} not found"), border_style="red"))
         return
     
     date = article['published_at'].strftime('%Y-%m-%d') if article.get('published_at') else 'N/A'
@@ -212,7 +576,7 @@ def show_article(id: int):
     console.print(Panel(
         f"[bold]{article['title']}[/bold]\n\n"
         f"[dim]Date: {date} | Category: {article['category'].title()}[/dim]\n\n"
-        + article['content'] + "\n\n"
+        + (article['content'] or _missing_content(article)) + "\n\n"
         f"[dim]Source: {article['source']}[/dim]\n"
         f"[dim]URL: {article['url']}[/dim]",
         title=f"[green]#{id}[/green]",
@@ -0,0 +1,48 @@
+"""Configuration resolved lazily from config/config.env and the environment."""
+import os
+import threading
+from typing import Optional
+
+CONFIG_ENV = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config/config.env')
+
+_loaded = False
+_load_lock = threading.Lock()
+
+def load():
+    """Load config/config.env into the environment once, on first use."""
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path=CONFIG_ENV)
+            _loaded = True
+
+def get(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Get a configuration value."""
+    load()
+    return os.getenv(name, default)
+
+def get_int(name: str, default: int) -> int:
+    """Get an integer configuration value, falling back to the default."""
+    value = get(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+def get_bool(name: str, default: bool) -> bool:
+    """Get a boolean configuration value (1/true/yes/on), falling back to the default."""
+    value = get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def get_float(name: str, default: float) -> float:
+    """Get a float configuration value, falling back to the default."""
+    value = get(name)
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
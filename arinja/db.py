@@ -1,115 +1,730 @@
 """Database operations for storing and retrieving news articles."""
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import datetime
+import hashlib
+import sys
+import threading
+import time
 from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
-from dotenv import load_dotenv
-import os
-import sys
+import psycopg2.sql
+from . import config, fingerprint
+from .paging import make_cursor, parse_cursor
+
+# Connection pool defaults, overridable in config/config.env
+DEFAULT_POOL_SIZE = 5
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+class ConnectionPool:
+    """Bounded pool of psycopg2 connections, opened lazily and reused.
 
-# Load environment variables from config/config.env
-config_env = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config/config.env')
-load_dotenv(dotenv_path=config_env)
-POSTGRES_URI = os.getenv('POSTGRES_URI')
+    Connections idle for longer than ``health_check_interval`` seconds are
+    checked with ``SELECT 1`` before being handed out and replaced if dead.
+    """
 
-if not POSTGRES_URI:
-    print("Error: POSTGRES_URI environment variable not found in config/config.env")
-    sys.exit(1)
+    def __init__(self, dsn: str, size: int = DEFAULT_POOL_SIZE,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL):
+        self.dsn = dsn
+        self.size = max(1, size)
+        self.health_check_interval = health_check_interval
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = []  # (connection, last used) pairs, most recent last
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        """Check an idle connection before handing it out."""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Take a connection, waiting if all of them are in use."""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, last_used = self._idle.pop()
+                if self._is_healthy(conn, last_used):
+                    return conn
+                conn.close()
+            return psycopg2.connect(self.dsn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn):
+        """Return a connection, rolling back any open transaction."""
+        try:
+            if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    conn.close()
+            if not conn.closed:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_postgres_uri() -> str:
+    """Resolve the database URI from config/config.env."""
+    postgres_uri = config.get('POSTGRES_URI')
+    if not postgres_uri:
+        print("Error: POSTGRES_URI environment variable not found in config/config.env", file=sys.stderr)
+        sys.exit(1)
+    return postgres_uri
+
+def get_pool() -> ConnectionPool:
+    """Get the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_postgres_uri(),
+                    size=config.get_int('ARINJA_DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+                    health_check_interval=config.get_float(
+                        'ARINJA_DB_HEALTH_CHECK_INTERVAL', DEFAULT_HEALTH_CHECK_INTERVAL
+                    )
+                )
+    return _pool
+
+def close_pool():
+    """Close pooled connections. The pool is recreated on next use."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool = None
 
 @contextmanager
 def get_db_connection():
-    """Get a database connection."""
-    conn = None
+    """Borrow a database connection from the shared pool."""
+    pool = get_pool()
+    conn = pool.getconn()
     try:
-        conn = psycopg2.connect(POSTGRES_URI)
         yield conn
     finally:
-        if conn is not None:
-            conn.close()
+        pool.putconn(conn)
+
+# Number of articles written per round of statements in store_articles
+STORE_BATCH_SIZE = 500
 
-def store_articles(articles: List[Dict]) -> List[int]:
-    """Store articles in the database, handling duplicates."""
-    article_ids = []
+# Channel notified when a transaction that added or removed articles
+# commits; the payload lists the categories involved, comma separated,
+# and is empty when any category may have changed
+ARTICLES_CHANNEL = 'arinja_articles'
+
+# Search vector of an article, title weighted above body. Filled in on
+# insert, since the body lives in article_bodies
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({title}, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({content}, '')), 'B')"
+)
+
+def body_hash(content: str) -> bytes:
+    """Key of a body in article_bodies: the SHA-256 of its UTF-8 text."""
+    return hashlib.sha256(content.encode('utf-8')).digest()
+
+def store_articles(
+    articles: List[Dict],
+    batch_size: int = STORE_BATCH_SIZE,
+    skip_duplicate_bodies: Optional[bool] = None
+) -> List[int]:
+    """Store articles in the database, handling duplicates.
+
+    Returns one id per article, in input order. Articles matching an existing
+    title/source/day (including earlier articles in the same call) get the
+    id of the stored article instead of being inserted again.
+
+    Bodies go to article_bodies under their hash, so identical bodies are
+    stored once. Articles without content keep their ``fetch_status`` and
+    ``http_status`` instead.
+
+    Each new article is fingerprinted and joins the cluster of a stored
+    near-duplicate, if any (see fingerprint). With ``skip_duplicate_bodies``
+    (default: ARINJA_SKIP_DUPLICATE_BODIES) such articles are stored without
+    content and get_article_by_id serves the cluster's body instead.
+    """
+    if skip_duplicate_bodies is None:
+        skip_duplicate_bodies = config.get_bool('ARINJA_SKIP_DUPLICATE_BODIES', False)
+    if not articles:
+        return []
+    # A partitioned table has no place for undated articles; they are
+    # filed under the time they were stored
+    stored_at = datetime.datetime.now()
     
+    # Stored articles need no fingerprint or search vector, so look them
+    # up before doing any work on them
     with get_db_connection() as conn:
+        partitioned = ensure_partitions(conn, [article['published_at'] or stored_at for article in articles])
+        undated = stored_at if partitioned else None
+        published = [article['published_at'] or undated for article in articles]
         with conn.cursor() as cur:
-            for article in articles:
-                # Check for duplicates
-                cur.execute("""
-                    SELECT id FROM articles 
-                    WHERE title = %s AND source = %s
-                    AND published_at::date = %s::date
-                """, (article['title'], article['source'], article['published_at']))
-                
-                result = cur.fetchone()
-                if result:
-                    article_ids.append(result[0])
-                    continue
-                
-                # Insert new article
-                cur.execute("""
-                    INSERT INTO articles 
-                    (title, source, published_at, content, category, url)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    article['title'],
-                    article['source'],
-                    article['published_at'],
-                    article['content'],
-                    article['category'],
-                    article['url']
-                ))
-                
-                article_ids.append(cur.fetchone()[0])
-        
+            ids = _stored_ids(cur, [
+                (position, article['title'], article['source'], published_at)
+                for position, (article, published_at) in enumerate(zip(articles, published))
+            ])
+        conn.rollback()
+    
+    # Repeats of an earlier article in the call take its id
+    new: List[int] = []
+    repeats: Dict[int, int] = {}
+    first: Dict[Tuple, int] = {}
+    for position, (article, published_at) in enumerate(zip(articles, published)):
+        if position in ids:
+            continue
+        key = (article['title'], article['source'], published_at.date()) if published_at else None
+        if key in first:
+            repeats[position] = first[key]
+            continue
+        if key:
+            first[key] = position
+        new.append(position)
+    
+    if new:
+        # Fingerprinting is CPU work; keep it out of the write transaction
+        signatures = {position: fingerprint.signature(articles[position]['content']) for position in new}
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                for start in range(0, len(new), batch_size):
+                    batch = new[start:start + batch_size]
+                    ids.update(zip(batch, _store_batch(
+                        cur, [articles[position] for position in batch],
+                        [signatures[position] for position in batch],
+                        skip_duplicate_bodies, undated, partitioned
+                    )))
+                notify_articles_changed(cur, [articles[position]['category'] for position in new])
+            conn.commit()
+    
+    return [ids[repeats.get(position, position)] for position in range(len(articles))]
+
+def notify_articles_changed(cur, categories: Optional[List[str]] = None):
+    """Tell listeners on ARTICLES_CHANNEL (arinja serve) that articles changed.
+
+    Postgres delivers the notification only if and when the current
+    transaction commits. Without categories every category is affected.
+    """
+    cur.execute("SELECT pg_notify(%s, %s)", (ARTICLES_CHANNEL, ','.join(sorted(set(categories or [])))))
+
+def ensure_partitions(conn, days: List[datetime.datetime]) -> bool:
+    """Create the monthly partitions holding these publication times.
+
+    Returns False, creating nothing, when articles is not partitioned (see
+    scripts/init_db.py --partition). Otherwise commits on ``conn`` right
+    away, since creating a partition locks the whole table until commit;
+    call it before writing the articles.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT arinja_ensure_partitions(%s::timestamp[])", (days,))
+        partitioned = cur.fetchone()[0]
+    if partitioned:
         conn.commit()
+    return partitioned
+
+def _assign_clusters(
+    cur,
+    reserved: List[int],
+    signatures: List[Optional[List[int]]],
+    keys: List[Optional[List[int]]]
+) -> List[Tuple[Optional[int], bool]]:
+    """Pick (cluster id, matched a stored article) for each fingerprinted article.
+
+    Candidates come from one lookup on the LSH band keys of the whole batch;
+    earlier articles of the batch are candidates for later ones. Articles
+    without a near-duplicate start a cluster under their own id.
+    """
+    # band key -> [(signature, cluster id, stored)]
+    candidates: Dict[int, List[Tuple[List[int], int, bool]]] = {}
+    batch_keys = sorted({key for article_keys in keys if article_keys for key in article_keys})
+    if batch_keys:
+        # One index probe per key: the planner misjudges && against a long
+        # array and scans the whole table instead
+        cur.execute("""
+            SELECT DISTINCT ON (a.id) a.minhash, a.cluster_id, a.lsh_bands
+            FROM unnest(%s::integer[]) AS k(key)
+            JOIN articles a ON a.lsh_bands @> ARRAY[k.key]
+            ORDER BY a.id
+        """, (batch_keys,))
+        for signature, cluster_id, row_keys in cur.fetchall():
+            for key in row_keys:
+                candidates.setdefault(key, []).append((signature, cluster_id, True))
+    
+    clusters = []
+    for article_id, signature, article_keys in zip(reserved, signatures, keys):
+        if signature is None:
+            clusters.append((None, False))
+            continue
+        match = next((
+            (cluster_id, stored)
+            for key in article_keys for other, cluster_id, stored in candidates.get(key, ())
+            if fingerprint.similarity(signature, other) >= fingerprint.THRESHOLD
+        ), (article_id, False))
+        clusters.append(match)
+        for key in article_keys:
+            candidates.setdefault(key, []).append((signature, match[0], False))
+    return clusters
+
+def _stored_ids(cur, keys: List[Tuple[int, str, str, Optional[datetime.datetime]]]) -> Dict[int, int]:
+    """Ids of stored articles by position, for (position, title, source, published_at) keys.
+
+    One lookup on the dedup key; positions with no stored article are left out.
+    """
+    if not keys:
+        return {}
+    rows = psycopg2.extras.execute_values(cur, """
+        SELECT DISTINCT ON (v.position) v.position, a.id
+        FROM (VALUES %s) AS v(position, title, source, published_at)
+        JOIN articles a ON a.title = v.title AND a.source = v.source
+            AND a.published_at::date = v.published_at::date
+        ORDER BY v.position, a.id
+    """, keys, page_size=len(keys), fetch=True)
+    return dict(rows)
+
+def _store_batch(
+    cur,
+    articles: List[Dict],
+    signatures: List[Optional[List[int]]],
+    skip_duplicate_bodies: bool = False,
+    undated: Optional[datetime.datetime] = None,
+    partitioned: bool = False
+) -> List[int]:
+    """Insert a batch of articles in five statements and return their ids.
+
+    ``signatures`` are the articles' fingerprints. Articles without a
+    publication time get ``undated`` instead. Raises rather than return
+    fewer ids than articles.
+    """
+    if not articles:
+        return []
+    published = [article['published_at'] or undated for article in articles]
+    
+    # Reserve ids up front so inserted rows can be matched back to the input
+    cur.execute(
+        "SELECT nextval(pg_get_serial_sequence('articles', 'id')) FROM generate_series(1, %s)",
+        (len(articles),)
+    )
+    reserved = [row[0] for row in cur.fetchall()]
+    
+    keys = [fingerprint.bands(signature) if signature else None for signature in signatures]
+    clusters = _assign_clusters(cur, reserved, signatures, keys)
+    
+    # Only bodies already committed under the cluster may be dropped
+    contents = [
+        None if skip_duplicate_bodies and stored else article['content']
+        for article, (_, stored) in zip(articles, clusters)
+    ]
+    hashes = [body_hash(content) if content else None for content in contents]
+    
+    # Duplicates (of stored rows or of earlier rows in this batch) hit
+    # articles_dedup_idx and are skipped; anything else, such as an id
+    # already taken, raises. Postgres cannot name the per-partition dedup
+    # indexes of a partitioned table as a conflict target, so there any
+    # conflict is skipped and an unresolved article raises below
+    template = "(" + "%s, " * 12 + SEARCH_VECTOR.format(title='%s', content='%s') + ")"
+    conflict = "" if partitioned else "(title, source, (published_at::date))"
+    inserted = psycopg2.extras.execute_values(cur, f"""
+        INSERT INTO articles 
+        (id, title, source, published_at, body_hash, fetch_status, http_status,
+         category, url, minhash, lsh_bands, cluster_id, search_vector)
+        VALUES %s
+        ON CONFLICT {conflict} DO NOTHING
+        RETURNING id
+    """, [
+        (
+            article_id,
+            article['title'],
+            article['source'],
+            published_at,
+            digest,
+            article.get('fetch_status', 'ok'),
+            article.get('http_status'),
+            article['category'],
+            article['url'],
+            signature,
+            article_keys,
+            cluster_id,
+            article['title'],
+            content
+        )
+        for article_id, article, published_at, content, digest, signature, article_keys, (cluster_id, _)
+        in zip(reserved, articles, published, contents, hashes, signatures, keys, clusters)
+    ], template=template, page_size=len(articles), fetch=True)
+    inserted_ids = {row[0] for row in inserted}
+    
+    # Bodies of the inserted rows; ones already stored hit the primary key
+    bodies = {
+        digest: content
+        for article_id, content, digest in zip(reserved, contents, hashes)
+        if digest and article_id in inserted_ids
+    }
+    if bodies:
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO article_bodies (hash, content) VALUES %s
+            ON CONFLICT DO NOTHING
+        """, list(bodies.items()), page_size=len(bodies))
+    
+    # Resolve ids of duplicates stored since store_articles looked
+    existing = _stored_ids(cur, [
+        (position, article['title'], article['source'], published_at)
+        for position, (article_id, article, published_at) in enumerate(zip(reserved, articles, published))
+        if article_id not in inserted_ids
+    ])
     
-    return article_ids
+    unresolved = [article_id for position, article_id in enumerate(reserved)
+                  if article_id not in inserted_ids and position not in existing]
+    if unresolved:
+        raise RuntimeError(
+            f"{len(unresolved)} of {len(articles)} articles were neither stored nor found as "
+            f"duplicates (ids {unresolved[:5]} may already be taken)"
+        )
+    return [article_id if article_id in inserted_ids else existing[position]
+            for position, article_id in enumerate(reserved)]
+
+def find_stored(articles: List[Dict]) -> List[bool]:
+    """Flag articles that are already stored, by URL or title/source/day.
+
+    Runs a single lookup for the whole list so callers can skip downloading
+    content for known articles.
+    """
+    if not articles:
+        return []
+    
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            rows = psycopg2.extras.execute_values(cur, """
+                SELECT v.position
+                FROM (VALUES %s) AS v(position, url, title, source, published_at)
+                WHERE EXISTS (SELECT 1 FROM articles a WHERE a.url = v.url)
+                   OR EXISTS (
+                       SELECT 1 FROM articles a
+                       WHERE a.title = v.title AND a.source = v.source
+                       AND a.published_at::date = v.published_at::date
+                   )
+            """, [
+                (position, article['url'], article['title'], article['source'], article['published_at'])
+                for position, article in enumerate(articles)
+            ], page_size=len(articles), fetch=True)
+    
+    stored = {row[0] for row in rows}
+    return [position in stored for position in range(len(articles))]
+
+def get_completed_windows(
+    categories: List[str],
+    from_date: datetime.date,
+    to_date: datetime.date
+) -> Set[Tuple[str, datetime.date, datetime.date]]:
+    """Get (category, window start, window end) of checkpointed backfill windows in a range."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT category, window_start, window_end FROM fetch_checkpoints
+                WHERE category = ANY(%s) AND window_start >= %s AND window_end <= %s
+            """, (categories, from_date, to_date))
+            return {tuple(row) for row in cur.fetchall()}
+
+def mark_window_complete(category: str, window_start: datetime.date, window_end: datetime.date, article_count: int):
+    """Checkpoint a backfill window whose articles have been committed."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO fetch_checkpoints (category, window_start, window_end, article_count)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (category, window_start, window_end)
+                DO UPDATE SET article_count = EXCLUDED.article_count, completed_at = CURRENT_TIMESTAMP
+            """, (category, window_start, window_end, article_count))
+        conn.commit()
+
+def get_watermarks(categories: List[str]) -> Dict[str, datetime.datetime]:
+    """Get the last successful incremental fetch time per category."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT category, fetched_until FROM fetch_watermarks
+                WHERE category = ANY(%s)
+            """, (categories,))
+            return dict(cur.fetchall())
+
+def set_watermark(category: str, fetched_until: datetime.datetime):
+    """Advance a category's watermark after its articles are committed."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO fetch_watermarks (category, fetched_until)
+                VALUES (%s, %s)
+                ON CONFLICT (category) DO UPDATE
+                SET fetched_until = GREATEST(fetch_watermarks.fetched_until, EXCLUDED.fetched_until),
+                    updated_at = CURRENT_TIMESTAMP
+            """, (category, fetched_until))
+        conn.commit()
+
+# Listing order: newest first, undated articles last, id breaks ties.
+# Matches the articles_listing_idx / articles_category_listing_idx indexes.
+LISTING_KEY = "COALESCE(published_at, '-infinity'::timestamp)"
+LISTING_BATCH_SIZE = 500
+
+def _listing_query(
+    category: Optional[str],
+    from_date: Optional[datetime.datetime],
+    to_date: Optional[datetime.datetime],
+    before: Optional[Tuple[str, int]],
+    limit: int,
+    collapse: bool = False
+) -> Tuple[str, List]:
+    """Build a keyset-paginated listing query."""
+    filters = ""
+    filter_params: List = []
+    
+    if category:
+        filters += " AND {t}.category = %s"
+        filter_params.append(category)
+    
+    if from_date:
+        filters += " AND {t}.published_at >= %s"
+        filter_params.append(from_date)
+    
+    if to_date:
+        filters += " AND {t}.published_at <= %s"
+        filter_params.append(to_date)
+    
+    if collapse:
+        # Show only the newest matching article of each story, with the
+        # number of other matching articles in the same cluster
+        query = """
+            SELECT id, title, source, published_at, category, url,
+                   (SELECT count(*) FROM articles d
+                    WHERE d.cluster_id = a.cluster_id AND d.id <> a.id{d_filters}) AS duplicates
+            FROM articles a
+            WHERE 1=1{a_filters}
+            AND NOT EXISTS (
+                SELECT 1 FROM articles d
+                WHERE d.cluster_id = a.cluster_id{d_filters}
+                AND (COALESCE(d.published_at, '-infinity'::timestamp), d.id)
+                    > (COALESCE(a.published_at, '-infinity'::timestamp), a.id)
+            )
+        """.format(a_filters=filters.format(t='a'), d_filters=filters.format(t='d'))
+        params = filter_params * 3
+    else:
+        query = f"""
+            SELECT id, title, source, published_at, category, url
+            FROM articles a
+            WHERE 1=1{filters.format(t='a')}
+        """
+        params = list(filter_params)
+    
+    if before:
+        # Row comparison seeks straight to the cursor in the listing index;
+        # the implied bound on published_at lets a partitioned table skip
+        # the partitions after the cursor
+        query += f" AND ({LISTING_KEY}, id) < (%s::timestamp, %s)"
+        query += " AND (published_at <= %s::timestamp OR published_at IS NULL)"
+        params.extend([*before, before[0]])
+    
+    query += f" ORDER BY {LISTING_KEY} DESC, id DESC LIMIT %s"
+    params.append(limit)
+    return query, params
 
 def get_articles(
+    category: Optional[str] = None,
+    from_date: Optional[datetime.datetime] = None,
+    to_date: Optional[datetime.datetime] = None,
+    limit: int = 20,
+    before: Optional[str] = None,
+    collapse: bool = False
+) -> List[Dict]:
+    """Retrieve articles from the database with optional filters.
+
+    Pass the make_cursor of the last article of a page as ``before`` to get
+    the next page. With ``collapse`` near-duplicates are listed once, as
+    their newest article, with a ``duplicates`` count of the others.
+    """
+    position = parse_cursor(before) if before else None
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            cur.execute(*_listing_query(category, from_date, to_date, position, limit, collapse))
+            return [dict(row) for row in cur.fetchall()]
+
+def iter_articles(
+    category: Optional[str] = None,
+    from_date: Optional[datetime.datetime] = None,
+    to_date: Optional[datetime.datetime] = None,
+    before: Optional[str] = None,
+    batch_size: int = LISTING_BATCH_SIZE
+) -> Iterator[Dict]:
+    """Yield every matching article in listing order, one page at a time.
+
+    Each page is read with its own short query, so no connection or
+    transaction is held while the caller processes rows.
+    """
+    while True:
+        page = get_articles(category, from_date, to_date, batch_size, before)
+        yield from page
+        if len(page) < batch_size:
+            return
+        before = make_cursor(page[-1])
+
+def get_article_by_id(article_id: int) -> Optional[Dict]:
+    """Retrieve a single article by ID.
+
+    Articles stored without their body (see store_articles) get the body of
+    another article of their cluster. ``content`` is None for articles whose
+    download failed; ``fetch_status`` and ``http_status`` say why.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            cur.execute("""
+                SELECT id, title, source, published_at, category, url, fetch_status, http_status,
+                       (SELECT content FROM article_bodies WHERE hash = COALESCE(a.body_hash, (
+                           SELECT c.body_hash FROM articles c
+                           WHERE c.cluster_id = a.cluster_id AND c.body_hash IS NOT NULL
+                           ORDER BY c.id LIMIT 1
+                       ))) AS content
+                FROM articles a WHERE id = %s
+            """, (article_id,))
+            
+            result = cur.fetchone()
+            return dict(result) if result else None
+
+# Markers around matched words in search_articles snippets
+HIGHLIGHT_START = '<<'
+HIGHLIGHT_STOP = '>>'
+
+def search_articles(
+    query: str,
     category: Optional[str] = None,
     from_date: Optional[datetime.datetime] = None,
     to_date: Optional[datetime.datetime] = None,
     limit: int = 20
 ) -> List[Dict]:
-    """Retrieve articles from the database with optional filters."""
+    """Full-text search over article titles and content.
+
+    ``query`` uses web search syntax ("quoted phrases", -excluded, or).
+    Results are ranked, and each has a ``snippet`` with matched words
+    wrapped in HIGHLIGHT_START/HIGHLIGHT_STOP.
+    """
     with get_db_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
-            query = """
-                SELECT id, title, source, published_at, category, url
-                FROM articles
-                WHERE 1=1
-            """
-            params = []
+            filters = ""
+            params: List = [query]
             
             if category:
-                query += " AND category = %s"
+                filters += " AND category = %s"
                 params.append(category)
             
             if from_date:
-                query += " AND published_at >= %s"
+                filters += " AND published_at >= %s"
                 params.append(from_date)
             
             if to_date:
-                query += " AND published_at <= %s"
+                filters += " AND published_at <= %s"
                 params.append(to_date)
             
-            query += " ORDER BY published_at DESC LIMIT %s"
             params.append(limit)
             
-            cur.execute(query, params)
+            # Rank with the GIN index first; only read bodies and build
+            # headlines for the page
+            cur.execute(f"""
+                SELECT id, title, source, published_at, category, url, rank,
+                       ts_headline('english', coalesce(b.content, ''), q, %s) AS snippet
+                FROM (
+                    SELECT a.id, a.title, a.source, a.published_at, a.category, a.url, a.body_hash,
+                           q, ts_rank(a.search_vector, q) AS rank
+                    FROM articles a, websearch_to_tsquery('english', %s) AS q
+                    WHERE a.search_vector @@ q{filters}
+                    ORDER BY rank DESC, a.published_at DESC
+                    LIMIT %s
+                ) AS ranked
+                LEFT JOIN article_bodies b ON b.hash = ranked.body_hash
+                ORDER BY rank DESC, published_at DESC
+            """, [
+                f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MinWords=10, MaxWords=30",
+                *params
+            ])
             return [dict(row) for row in cur.fetchall()]
 
-def get_article_by_id(article_id: int) -> Optional[Dict]:
-    """Retrieve a single article by ID."""
+def prune_articles(before: datetime.datetime) -> Dict[str, int]:
+    """Delete articles published before the month of ``before``.
+
+    A partitioned table drops whole monthly partitions; otherwise the rows
+    are deleted. Undated articles are kept. Copies stored without a body
+    (see store_articles) whose cluster's body was pruned are pointed at
+    that body first, and bodies nothing refers to any more are deleted.
+    Returns the number of partitions, articles and bodies removed.
+    """
+    cutoff = datetime.datetime(before.year, before.month, 1)
+    removed = {'partitions': 0, 'articles': 0, 'bodies': 0}
+    
     with get_db_connection() as conn:
-        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+        with conn.cursor() as cur:
+            # Wait for running writers and hold off new ones, so no article
+            # starts using a body while it is being deleted; reads go on
+            cur.execute("LOCK TABLE articles IN SHARE MODE")
             cur.execute("""
-                SELECT id, title, source, published_at, content, category, url
-                FROM articles WHERE id = %s
-            """, (article_id,))
+                UPDATE articles a SET body_hash = (
+                    SELECT c.body_hash FROM articles c
+                    WHERE c.cluster_id = a.cluster_id AND c.body_hash IS NOT NULL
+                    ORDER BY c.id LIMIT 1
+                )
+                WHERE a.published_at >= %s AND a.body_hash IS NULL AND a.cluster_id IN (
+                    SELECT cluster_id FROM articles
+                    WHERE published_at < %s AND body_hash IS NOT NULL
+                )
+            """, (cutoff, cutoff))
+            cur.execute("""
+                DELETE FROM article_bodies b
+                WHERE hash IN (
+                    SELECT body_hash FROM articles WHERE published_at < %s AND body_hash IS NOT NULL
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM articles a
+                    WHERE a.body_hash = b.hash AND (a.published_at >= %s OR a.published_at IS NULL)
+                )
+            """, (cutoff, cutoff))
+            removed['bodies'] = cur.rowcount
             
-            result = cur.fetchone()
-            return dict(result) if result else None
\ No newline at end of file
+            # Upper bounds of the monthly partitions (see arinja_ensure_partitions)
+            cur.execute("""
+                SELECT c.relname,
+                       substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO [(]''([^'']*)''[)]')::timestamp
+                FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'articles'::regclass
+            """)
+            partitions = cur.fetchall()
+            if not partitions:
+                cur.execute("DELETE FROM articles WHERE published_at < %s", (cutoff,))
+                removed['articles'] = cur.rowcount
+            for name, upper in partitions:
+                if upper is None or upper > cutoff:
+                    continue
+                table = psycopg2.sql.Identifier(name)
+                cur.execute(psycopg2.sql.SQL("SELECT count(*) FROM {}").format(table))
+                removed['articles'] += cur.fetchone()[0]
+                cur.execute(psycopg2.sql.SQL("DROP TABLE {}").format(table))
+                removed['partitions'] += 1
+            notify_articles_changed(cur)
+        
+        conn.commit()
+    
+    return removed
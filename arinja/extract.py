@@ -0,0 +1,163 @@
+"""Article text extraction from raw HTML.
+
+Kept free of network and database imports so it stays cheap to load in
+extraction worker processes.
+"""
+import importlib.util
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from bs4 import BeautifulSoup
+
+# Placeholder older versions stored (and cached) in place of missing text
+NO_CONTENT = "Article content could not be retrieved. Please check the source URL."
+
+# Only substantial paragraphs count as article text
+MIN_PARAGRAPH_LENGTH = 100
+CONTENT_CLASS = re.compile(r'article|content|story')
+UNWANTED_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside']
+
+# Stop collecting paragraphs once this much article text has been found
+DEFAULT_MAX_CHARS = 50000
+# Containers, and the tags whose contents are removed before extraction;
+# not custom elements such as <main-nav>
+CONTAINER_TAG = re.compile(
+    r'<!--|<(/?)(article|main|{})(?=[\s>/])'.format('|'.join(UNWANTED_TAGS)), re.IGNORECASE
+)
+# Tags whose contents are raw text rather than markup
+RAW_TEXT_END = {name: re.compile(f'</{name}', re.IGNORECASE) for name in ('script', 'style')}
+
+DEFAULT_PARSER = 'html.parser'
+PARSERS = ('html.parser', 'lxml', 'auto')
+DEFAULT_PROCESSES = os.cpu_count() or 1
+
+def resolve_parser(parser: str = DEFAULT_PARSER) -> str:
+    """Resolve a parser name; 'auto' picks lxml when it is installed.
+
+    Raises ValueError for an unknown parser, or for lxml when it is not
+    installed, rather than failing on every page later.
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser '{parser}'. Choose from: {', '.join(PARSERS)}")
+    if parser == 'html.parser':
+        return parser
+    if importlib.util.find_spec('lxml') is not None:
+        return 'lxml'
+    if parser == 'lxml':
+        raise ValueError("The lxml parser is not installed. Install lxml or use --parser html.parser")
+    return 'html.parser'
+
+def trim_to_container(html: str) -> str:
+    """Cut the page after the first article/main container closes.
+
+    Only the first container is used for extraction, so the rest of the page
+    need not be parsed. Containers in comments, scripts, styles or tags that
+    extract_text removes (a related story in an <aside>) are not counted.
+    Pages where the first container holds another container are left alone.
+    """
+    opened = None
+    # Open unwanted tags; containers inside them are removed with them
+    unwanted = dict.fromkeys(UNWANTED_TAGS, 0)
+    pos = 0
+    while True:
+        match = CONTAINER_TAG.search(html, pos)
+        if match is None:
+            return html
+        pos = match.end()
+        if match.group(0) == '<!--':
+            end = html.find('-->', pos)
+            if end == -1:
+                return html
+            pos = end + 3
+            continue
+        closing, name = match.group(1), match.group(2).lower()
+        if name in RAW_TEXT_END:
+            if not closing:
+                end = RAW_TEXT_END[name].search(html, pos)
+                if end is None:
+                    return html
+                pos = end.end()
+        elif name in unwanted:
+            unwanted[name] = max(0, unwanted[name] + (-1 if closing else 1))
+        elif any(unwanted.values()):
+            continue
+        elif opened is None:
+            if closing:
+                return html
+            opened = name
+        elif not closing:
+            # Nested container; the simple cut could drop content
+            return html
+        elif name == opened:
+            end = html.find('>', match.end())
+            return html[:end + 1] if end != -1 else html
+
+def extract_text(html: str, parser: str = DEFAULT_PARSER, max_chars: Optional[int] = DEFAULT_MAX_CHARS) -> str:
+    """Extract the main article text from an HTML page.
+
+    Parsing stops at the end of the first article/main container, and
+    paragraph collection stops after ``max_chars`` characters of text.
+    Returns an empty string when the page has no article text.
+    """
+    soup = BeautifulSoup(trim_to_container(html), parser)
+
+    # Remove unwanted elements
+    for tag in soup(UNWANTED_TAGS):
+        tag.decompose()
+
+    # Try to find article content
+    article_tags = soup.find_all(['article', 'main']) or soup.find_all(class_=CONTENT_CLASS)
+
+    if article_tags:
+        # Use the first article/main content area
+        content_area = article_tags[0]
+    else:
+        # Fallback to body
+        content_area = soup.body or soup
+
+    # Extract paragraphs
+    paragraphs = []
+    length = 0
+    for p in content_area.find_all('p'):
+        text = p.get_text().strip()
+        if len(text) > MIN_PARAGRAPH_LENGTH:
+            paragraphs.append(text)
+            length += len(text)
+            if max_chars and length >= max_chars:
+                break
+    return '\n\n'.join(paragraphs)
+
+class Extractor:
+    """Runs extract_text inline or in a pool of worker processes.
+
+    BeautifulSoup parsing is CPU-bound and holds the GIL, so with
+    ``processes`` > 1 download threads hand pages to the pool and wait for
+    the text while other downloads continue.
+    """
+
+    def __init__(self, processes: int = 0, parser: str = DEFAULT_PARSER,
+                 max_chars: Optional[int] = DEFAULT_MAX_CHARS):
+        self.parser = resolve_parser(parser)
+        self.max_chars = max_chars
+        self.processes = processes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if processes > 1:
+            # Spawned workers avoid forking a process that is running threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+    def extract(self, html: str) -> str:
+        """Extract article text, blocking until the result is ready."""
+        if self._pool is None:
+            return extract_text(html, self.parser, self.max_chars)
+        return self._pool.submit(extract_text, html, self.parser, self.max_chars).result()
+
+    def close(self):
+        """Shut down worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,167 @@
+"""Timers, counters and latency histograms for fetch runs."""
+import cProfile
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Upper bounds, in seconds, of the per-host latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Metrics:
+    """Thread-safe instrumentation for one fetch run.
+
+    ``stage`` times a named stage (GNews query, download, extraction,
+    categorisation, storage...), ``count`` bumps a counter and
+    ``observe_host`` records a request latency in the host's histogram.
+    ``snapshot`` returns everything as plain data and ``to_prometheus``
+    renders it in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.stages: Dict[str, List[float]] = {}  # stage -> [calls, seconds]
+        self.counters: Dict[str, float] = {}
+        self.hosts: Dict[str, List[float]] = {}  # host -> bucket counts..., +Inf, sum
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            totals = self.stages.setdefault(name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe_host(self, host: str, seconds: float):
+        with self._lock:
+            histogram = self.hosts.get(host)
+            if histogram is None:
+                histogram = self.hosts[host] = [0] * (len(LATENCY_BUCKETS) + 2)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            else:
+                histogram[len(LATENCY_BUCKETS)] += 1
+            histogram[-1] += seconds
+
+    def snapshot(self) -> Dict:
+        """All metrics as JSON-serialisable data; histogram buckets are cumulative."""
+        with self._lock:
+            hosts = {}
+            for host, histogram in sorted(self.hosts.items()):
+                running = 0
+                buckets = {}
+                for bound, count in zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], histogram[:-1]):
+                    running += count
+                    buckets[bound] = running
+                hosts[host] = {'count': running, 'sum': round(histogram[-1], 6), 'buckets': buckets}
+            return {
+                'started_at': self.started,
+                'duration_seconds': round(time.time() - self.started, 6),
+                'stages': {
+                    name: {'calls': calls, 'seconds': round(seconds, 6)}
+                    for name, (calls, seconds) in sorted(self.stages.items())
+                },
+                'counters': dict(sorted(self.counters.items())),
+                'hosts': hosts,
+            }
+
+    def to_prometheus(self, prefix: str = 'arinja_fetch') -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        data = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_duration_seconds Wall time of the last fetch run.",
+            f"# TYPE {prefix}_duration_seconds gauge",
+            f"{prefix}_duration_seconds {data['duration_seconds']}",
+            f"# HELP {prefix}_stage_seconds Time spent per stage in the last fetch run.",
+            f"# TYPE {prefix}_stage_seconds gauge",
+        ]
+        for name, stage in data['stages'].items():
+            lines.append(f'{prefix}_stage_seconds{{stage="{name}"}} {stage["seconds"]}')
+        lines += [
+            f"# HELP {prefix}_stage_calls Times each stage ran in the last fetch run.",
+            f"# TYPE {prefix}_stage_calls gauge",
+        ]
+        for name, stage in data['stages'].items():
+            lines.append(f'{prefix}_stage_calls{{stage="{name}"}} {stage["calls"]}')
+        lines += [
+            f"# HELP {prefix}_events Counters from the last fetch run.",
+            f"# TYPE {prefix}_events gauge",
+        ]
+        for name, value in data['counters'].items():
+            lines.append(f'{prefix}_events{{event="{name}"}} {value}')
+        lines += [
+            f"# HELP {prefix}_host_request_seconds Article download latency per host.",
+            f"# TYPE {prefix}_host_request_seconds histogram",
+        ]
+        for host, histogram in data['hosts'].items():
+            label = host.replace('\\', '\\\\').replace('"', '\\"')
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{prefix}_host_request_seconds_bucket{{host="{label}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_host_request_seconds_sum{{host="{label}"}} {histogram["sum"]}')
+            lines.append(f'{prefix}_host_request_seconds_count{{host="{label}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write a textfile-collector file, replacing it atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.arinja-metrics-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+@contextmanager
+def profile_run(path: Optional[str]) -> Iterator[None]:
+    """Profile the calling thread and every thread started inside the block.
+
+    Stats from all threads are merged and dumped to ``path`` for pstats or
+    snakeviz. Extraction worker processes are not profiled. Does nothing
+    when ``path`` is None.
+    """
+    if path is None:
+        yield
+        return
+    
+    profilers = [cProfile.Profile()]
+    lock = threading.Lock()
+
+    def start_thread(frame, event, arg):
+        # Runs once in each new thread, replacing itself with a profiler
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        with lock:
+            profilers.append(profiler)
+        profiler.enable()
+
+    threading.setprofile(start_thread)
+    profilers[0].enable()
+    try:
+        yield
+    finally:
+        profilers[0].disable()
+        threading.setprofile(None)
+        with lock:
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+        stats.dump_stats(path)
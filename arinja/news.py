@@ -1,13 +1,21 @@
 """News fetching and processing utilities."""
 import datetime
+import json
+import os
 import re
-from typing import List, Dict, Optional
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
 import pytz
 import requests
-from bs4 import BeautifulSoup
 from gnews import GNews
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from urllib.parse import urlparse, parse_qs
+from . import config, web
+from .extract import NO_CONTENT, Extractor
+from .metrics import Metrics
+from .pagecache import PageCache
 
 def clean_google_url(url: str) -> str:
     """Clean Google News redirect URLs to get the actual article URL."""
@@ -25,17 +33,217 @@ def clean_google_url(url: str) -> str:
 # IST timezone
 IST = pytz.timezone('Asia/Kolkata')
 
+# Incremental fetches further back than this fall back to the default range
+MAX_INCREMENTAL_AGE = datetime.timedelta(days=7)
+
+# Default concurrency for article body downloads
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = web.DEFAULT_PER_HOST
+
+# Fetch status stored with each article in place of placeholder text
+FETCH_OK = 'ok'
+FETCH_NO_CONTENT = 'no_content'              # page downloaded, but no article text in it
+FETCH_HTTP_ERROR = 'http_error'              # publisher answered with an error status
+FETCH_TIMEOUT = 'timeout'
+FETCH_CONNECTION_ERROR = 'connection_error'
+FETCH_HOST_SKIPPED = 'host_skipped'          # host's circuit was open after repeated failures
+FETCH_UNSUPPORTED = 'unsupported'            # not an HTML page
+FETCH_ERROR = 'error'
+
+class FetchResult(NamedTuple):
+    """Outcome of downloading one article page."""
+    content: Optional[str]
+    status: str = FETCH_OK
+    http_status: Optional[int] = None
+
+def text_result(content: Optional[str]) -> FetchResult:
+    """FetchResult for extracted (or cached) article text."""
+    if not content or content == NO_CONTENT:
+        return FetchResult(None, FETCH_NO_CONTENT)
+    return FetchResult(content)
+
+def error_result(error: Exception) -> FetchResult:
+    """FetchResult for a failed download."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return FetchResult(None, FETCH_HTTP_ERROR, error.response.status_code)
+    if isinstance(error, web.CircuitOpenError):
+        return FetchResult(None, FETCH_HOST_SKIPPED)
+    if isinstance(error, web.UnsupportedContentError):
+        return FetchResult(None, FETCH_UNSUPPORTED)
+    if isinstance(error, requests.Timeout):
+        return FetchResult(None, FETCH_TIMEOUT)
+    if isinstance(error, requests.ConnectionError):
+        return FetchResult(None, FETCH_CONNECTION_ERROR)
+    return FetchResult(None, FETCH_ERROR)
+
 def get_current_ist_time() -> datetime.datetime:
     """Get current time in IST."""
     return datetime.datetime.now(IST)
 
+def period_since(since: datetime.datetime) -> Optional[str]:
+    """GNews period (e.g. '3h') covering everything published since a time.
+
+    Returns None when ``since`` is older than MAX_INCREMENTAL_AGE.
+    """
+    age = get_current_ist_time() - since
+    if age > MAX_INCREMENTAL_AGE:
+        return None
+    hours = max(1, -(-int(age.total_seconds()) // 3600))
+    return f"{hours}h"
+
+# Enhanced keyword-based categorization, in priority order: an article goes
+# to the first category with a matching keyword. Keywords match whole words,
+# optionally followed by a plural "s"/"es".
+CATEGORY_KEYWORDS = {
+    'technology': [
+        'tech', 'technology', 'ai', 'robot', 'robots', 'smartphone', 'smartphones', 'computer', 'computers',
+        'software', 'app', 'apps', 'digital', 'gadget', 'gadgets', 'mobile', 'cyber', 'cybersecurity', 'code',
+        'programming', 'developer', 'developers', '5g', 'blockchain', 'cryptocurrency', 'bitcoin', 'internet',
+        'website', 'websites', 'online', 'startup', 'startups'
+    ],
+    'business': [
+        'market', 'markets', 'stock', 'stocks', 'economy', 'economic', 'trade', 'business', 'company',
+        'companies', 'finance', 'investment', 'investments', 'revenue', 'profit', 'profits', 'earnings',
+        'shares', 'investor', 'investors', 'banking', 'corporate', 'industry', 'industries', 'sector',
+        'sectors', 'startup', 'startups', 'valuation', 'funding'
+    ],
+    'sports': [
+        'cricket', 'football', 'sport', 'sports', 'match', 'matches', 'game', 'games', 'player', 'players',
+        'tournament', 'tournaments', 'team', 'teams', 'score', 'scores', 'win', 'wins', 'lose', 'loses',
+        'championship', 'championships', 'series', 'athletics', 'olympic', 'olympics', 'cup', 'league',
+        'leagues', 'stadium', 'coach', 'coaches', 'athlete', 'athletes'
+    ],
+    'entertainment': [
+        'movie', 'movies', 'film', 'films', 'actor', 'actors', 'celebrity', 'celebrities', 'music', 'song',
+        'songs', 'tv', 'show', 'shows', 'star', 'stars', 'cinema', 'drama', 'series', 'concert', 'concerts',
+        'award', 'awards', 'director', 'box office', 'netflix', 'streaming', 'hollywood', 'bollywood'
+    ],
+    'science': [
+        'science', 'scientific', 'research', 'study', 'studies', 'discovery', 'discoveries', 'space', 'physics',
+        'biology', 'chemistry', 'scientist', 'scientists', 'experiment', 'experiments', 'laboratory',
+        'innovation', 'breakthrough', 'quantum', 'nasa', 'isro', 'astronomy'
+    ],
+    'health': [
+        'health', 'medical', 'disease', 'diseases', 'treatment', 'treatments', 'hospital', 'hospitals',
+        'doctor', 'doctors', 'patient', 'patients', 'medicine', 'medicines', 'vaccine', 'vaccines', 'virus',
+        'viruses', 'infection', 'infections', 'cure', 'surgery', 'therapy', 'clinic', 'clinics', 'research',
+        'drug', 'drugs', 'pharmaceutical'
+    ],
+    'world': [
+        'world', 'global', 'international', 'foreign', 'embassy', 'diplomat', 'diplomats',
+        'president', 'minister', 'ministers', 'united nations', 'treaty', 'summit',
+        'bilateral', 'overseas', 'abroad', 'foreign policy', 'war', 'wars', 'peace'
+    ],
+    'india': [
+        'india', 'indian', 'delhi', 'mumbai', 'bangalore', 'chennai',
+        'kolkata', 'hyderabad', 'modi', 'bjp', 'congress', 'parliament',
+        'lok sabha', 'supreme court', 'rbi', 'rupee', 'state'
+    ]
+}
+
+class CategoryMatcher:
+    """Keyword table compiled into a single word-boundary regex.
+
+    Each category is a named group, so one scan over the text finds every
+    matching category and the highest-priority one wins. Keywords match
+    whole words only, so plurals are listed as keywords of their own.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]], default: str = 'general'):
+        self.categories = list(keywords)
+        self.default = default
+        groups = []
+        for index, words in enumerate(keywords.values()):
+            # Longest first so multi-word keywords win over their prefixes
+            alternatives = '|'.join(
+                r'\s+'.join(re.escape(part) for part in word.lower().split())
+                for word in sorted(set(words), key=len, reverse=True)
+            )
+            groups.append(f"(?P<c{index}>{alternatives})")
+        self.pattern = re.compile(r"\b(?:" + '|'.join(groups) + r")\b") if groups else None
+
+    def detect(self, title: str, description: str) -> str:
+        """Detect the category of one article."""
+        if self.pattern is None:
+            return self.default
+        
+        best = len(self.categories)
+        for match in self.pattern.finditer(f"{title} {description}".lower()):
+            best = min(best, int(match.lastgroup[1:]))
+            if best == 0:
+                break
+        
+        return self.categories[best] if best < len(self.categories) else self.default
+
+    def detect_many(self, items: Iterable[Tuple[str, str]]) -> List[str]:
+        """Detect categories for (title, description) pairs."""
+        return [self.detect(title, description) for title, description in items]
+
+_matcher: Optional[CategoryMatcher] = None
+_matcher_lock = threading.Lock()
+
+def load_category_keywords(path: str) -> Dict[str, List[str]]:
+    """Load a keyword table from a JSON object of category -> keywords.
+
+    Categories keep the file's order, which is their priority.
+    """
+    with open(os.path.expanduser(path), encoding='utf-8') as f:
+        keywords = json.load(f)
+    if not isinstance(keywords, dict) or not all(isinstance(v, list) for v in keywords.values()):
+        raise ValueError(f"{path} must map category names to keyword lists")
+    return keywords
+
+def get_category_matcher() -> CategoryMatcher:
+    """Get the shared matcher, compiled on first use.
+
+    Uses the table from ARINJA_CATEGORY_KEYWORDS (a JSON file) if set.
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                path = config.get('ARINJA_CATEGORY_KEYWORDS')
+                _matcher = CategoryMatcher(load_category_keywords(path) if path else CATEGORY_KEYWORDS)
+    return _matcher
+
+def detect_categories(items: Iterable[Tuple[str, str]]) -> List[str]:
+    """Categorise (title, description) pairs with the shared matcher."""
+    return get_category_matcher().detect_many(items)
+
 class NewsSource:
     """News source class for fetching and processing articles."""
     
-    def __init__(self, start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None):
-        """Initialize news sources with date range."""
+    def __init__(
+        self,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+        workers: int = DEFAULT_WORKERS,
+        per_host: int = DEFAULT_PER_HOST,
+        client: Optional[web.HttpClient] = None,
+        cache: Optional[PageCache] = None,
+        extractor: Optional[Extractor] = None,
+        since: Optional[datetime.datetime] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        """Initialize news sources with date range.
+
+        ``workers`` bounds how many article pages are downloaded at once. Pass
+        a shared ``client`` to reuse connections, retry budget and circuit
+        breakers across sources; otherwise one is created with ``per_host``
+        concurrent requests per publisher. Use ``workers=1`` for a serial run.
+        With a ``cache``, article text is reused across runs and revalidated
+        with conditional requests. A shared ``extractor`` moves HTML parsing
+        into worker processes; by default it runs in the download threads.
+        Without dates, ``since`` (a watermark) limits the query to articles
+        published after it. Stage timings, per-host download latencies and
+        failure counts are recorded in ``metrics``.
+        """
+        period = period_since(since) if since and not start_date and not end_date else None
+        
         # Default to last 7 days if no dates provided
-        if not start_date and not end_date:
+        if period:
+            start_date = end_date = None
+        elif not start_date and not end_date:
             end_date = datetime.datetime.now(IST).date()
             start_date = end_date - datetime.timedelta(days=7)
             
@@ -51,66 +259,126 @@ class NewsSource:
         self.gnews = GNews(
             language='en',
             country='IN',
+            period=period,
             start_date=start_date,
             end_date=end_date,
             max_results=100
         )
+
+        self.workers = max(1, workers)
+        self.client = client or web.HttpClient(per_host=per_host)
+        self.cache = cache
+        self.extractor = extractor or Extractor()
+        self.metrics = metrics or Metrics()
+        # Articles left out of fetch_headlines results by skip_known
+        self.skipped = 0
+        # Set when the GNews query failed, so callers don't checkpoint
+        self.failed = False
+
+    def fetch_article_content(self, url: str) -> FetchResult:
+        """Download an article page and extract its main text.
+
+        Failures are returned as a FetchResult without content and with
+        the status (and HTTP status code) describing what went wrong.
+        """
+        try:
+            cached = self.cache.get(url) if self.cache else None
+            if cached and cached.fresh:
+                return text_result(cached.content)
+            
+            # Revalidate stale cache entries instead of downloading again
+            headers = {}
+            if cached and cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached and cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+            
+            # Fetch article content
+            started = time.perf_counter()
+            try:
+                # Error responses come back closed, with no text
+                response, html = self.client.get_html(url, headers=headers)
+                if cached and response.status_code == 304:
+                    self.cache.mark_revalidated(url)
+                    return text_result(cached.content)
+                response.raise_for_status()
+            finally:
+                elapsed = time.perf_counter() - started
+                self.metrics.add_time('download', elapsed)
+                self.metrics.observe_host(urlparse(url).netloc.lower(), elapsed)
+            
+            with self.metrics.stage('extract'):
+                content = self.extractor.extract(html)
+            if not content:
+                self.metrics.count('extract_empty')
+            
+            if self.cache:
+                self.cache.put(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return text_result(content)
+            
+        except Exception as e:
+            self.metrics.count('download_errors')
+            return error_result(e)
+
+    def iter_contents(self, urls: List[str]) -> Iterator[FetchResult]:
+        """Yield fetch results for the given URLs in order, as they arrive."""
+        if self.workers == 1 or len(urls) <= 1:
+            for url in urls:
+                yield self.fetch_article_content(url)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls))) as executor:
+            yield from executor.map(self.fetch_article_content, urls)
+
+    def fetch_contents(self, urls: List[str]) -> List[FetchResult]:
+        """Fetch article bodies for the given URLs, preserving their order."""
+        return list(self.iter_contents(urls))
+
     def detect_category(self, title: str, description: str) -> str:
         """Detect article category from title and description."""
-        text = f"{title} {description}".lower()
-        
-        # Enhanced keyword-based categorization
-        categories = {
-            'technology': [
-                'tech', 'ai', 'robot', 'smartphone', 'computer', 'software', 'app', 'digital',
-                'gadget', 'mobile', 'cyber', 'code', 'programming', 'developer', '5g', 'blockchain',
-                'cryptocurrency', 'bitcoin', 'internet', 'website', 'online', 'startup'
-            ],
-            'business': [
-                'market', 'stock', 'economy', 'trade', 'business', 'company', 'finance',
-                'investment', 'revenue', 'profit', 'earnings', 'shares', 'investor', 'banking',
-                'corporate', 'industry', 'sector', 'startup', 'valuation', 'funding'
-            ],
-            'sports': [
-                'cricket', 'football', 'sport', 'match', 'game', 'player', 'tournament',
-                'team', 'score', 'win', 'lose', 'championship', 'series', 'athletics',
-                'olympic', 'cup', 'league', 'stadium', 'coach', 'athlete'
-            ],
-            'entertainment': [
-                'movie', 'film', 'actor', 'celebrity', 'music', 'song', 'tv', 'show',
-                'star', 'cinema', 'drama', 'series', 'concert', 'award', 'director',
-                'box office', 'netflix', 'streaming', 'hollywood', 'bollywood'
-            ],
-            'science': [
-                'science', 'research', 'study', 'discovery', 'space', 'physics',
-                'biology', 'chemistry', 'scientist', 'experiment', 'laboratory',
-                'innovation', 'breakthrough', 'quantum', 'nasa', 'isro', 'astronomy'
-            ],
-            'health': [
-                'health', 'medical', 'disease', 'treatment', 'hospital', 'doctor',
-                'patient', 'medicine', 'vaccine', 'virus', 'infection', 'cure',
-                'surgery', 'therapy', 'clinic', 'research', 'drug', 'pharmaceutical'
-            ],
-            'world': [
-                'world', 'global', 'international', 'foreign', 'embassy', 'diplomat',
-                'president', 'minister', 'united nations', 'treaty', 'summit',
-                'bilateral', 'overseas', 'abroad', 'foreign policy', 'war', 'peace'
-            ],
-            'india': [
-                'india', 'indian', 'delhi', 'mumbai', 'bangalore', 'chennai',
-                'kolkata', 'hyderabad', 'modi', 'bjp', 'congress', 'parliament',
-                'lok sabha', 'supreme court', 'rbi', 'rupee', 'state'
-            ]
-        }
+        return get_category_matcher().detect(title, description)
+
+    def fetch_headlines(
+        self,
+        category: Optional[str] = None,
+        skip_known: Optional[Callable[[List[Dict]], List[bool]]] = None
+    ) -> List[Dict]:
+        """Fetch headlines from various sources.
+
+        ``skip_known`` receives the headline metadata before any article page
+        is downloaded and returns one flag per article; flagged articles are
+        dropped from the results and counted in ``self.skipped``.
+        """
+        return list(self.iter_headlines(category, skip_known))
+
+    def iter_headlines(
+        self,
+        category: Optional[str] = None,
+        skip_known: Optional[Callable[[List[Dict]], List[bool]]] = None
+    ) -> Iterator[Dict]:
+        """Like fetch_headlines, but yield each article once its content is in.
+
+        Articles keep GNews order; only one category's headline metadata is
+        held in memory at a time.
+        """
+        articles = self._fetch_metadata(category)
         
-        for cat, keywords in categories.items():
-            if any(keyword in text for keyword in keywords):
-                return cat
+        if skip_known and articles:
+            with self.metrics.stage('skip_known'):
+                known = skip_known(articles)
+            self.skipped += sum(known)
+            articles = [data for data, is_known in zip(articles, known) if not is_known]
         
-        return 'general'
+        # Download article bodies concurrently; results keep article order
+        results = self.iter_contents([data['url'] for data in articles])
+        for data, result in zip(articles, results):
+            data['content'] = result.content
+            data['fetch_status'] = result.status
+            data['http_status'] = result.http_status
+            yield data
 
-    def fetch_headlines(self, category: Optional[str] = None) -> List[Dict]:
-        """Fetch headlines from various sources."""
+    def _fetch_metadata(self, category: Optional[str] = None) -> List[Dict]:
+        """Query GNews and build article dicts without content."""
         articles = []
         
         try:
@@ -130,15 +398,20 @@ class NewsSource:
                 query = f"{category} news{date_range}"
             
             # Use get_news which properly supports date ranges
-            news = self.gnews.get_news(query)
+            with self.metrics.stage('gnews_query'):
+                news = self.gnews.get_news(query)
+            
+            # Categorise the whole batch in one pass unless a category was requested
+            with self.metrics.stage('categorize'):
+                detected = [category] * len(news) if category else detect_categories(
+                    (article.get('title', ''), article.get('description', '')) for article in news
+                )
             
             # Process each article
-            for article in news:
+            for article, detected_category in zip(news, detected):
                 # Basic metadata
                 title = article.get('title', '')
-                description = article.get('description', '')
                 url = clean_google_url(article.get('url', ''))
-                detected_category = self.detect_category(title, description)
                 
                 # Clean title (remove source suffix if present)
                 title = re.sub(r'\s*-\s*[^-]+$', '', title)
@@ -160,52 +433,12 @@ class NewsSource:
                     'category': category or detected_category
                 }
                 
-                try:
-                    # Set up headers to mimic a browser
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                    }
-                    
-                    # Fetch article content
-                    response = requests.get(data['url'], headers=headers, timeout=10)
-                    response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Remove unwanted elements
-                    for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                        tag.decompose()
-                    
-                    # Try to find article content
-                    article_tags = soup.find_all(['article', 'main']) or soup.find_all(class_=re.compile(r'article|content|story'))
-                    
-                    if article_tags:
-                        # Use the first article/main content area
-                        content_area = article_tags[0]
-                    else:
-                        # Fallback to body
-                        content_area = soup.body
-                    
-                    # Extract paragraphs
-                    paragraphs = content_area.find_all('p')
-                    content = '\n\n'.join(
-                        p.get_text().strip()
-                        for p in paragraphs
-                        if len(p.get_text().strip()) > 100  # Only substantial paragraphs
-                    )
-                    
-                    # Add content if we found something meaningful
-                    if content:
-                        data['content'] = content
-                    else:
-                        data['content'] = "Article content could not be retrieved. Please check the source URL."
-                    
-                except Exception as e:
-                    data['content'] = f"Error fetching article: {str(e)}"
-                
                 articles.append(data)
         
         except Exception as e:
-            print(f"Error fetching headlines for category '{category}': {str(e)}")
+            self.failed = True
+            self.metrics.count('gnews_failures')
+            # stderr, so a --metrics document on stdout stays parseable
+            print(f"Error fetching headlines for category '{category}': {str(e)}", file=sys.stderr)
         
         return articles
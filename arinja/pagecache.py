@@ -0,0 +1,137 @@
+"""On-disk cache of extracted article text with HTTP revalidation data."""
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
+from . import config
+
+# Cache defaults, overridable in config/config.env
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'arinja')
+DEFAULT_FRESH_HOURS = 24.0
+DEFAULT_MAX_AGE_DAYS = 30.0
+DEFAULT_MAX_MB = 200.0
+
+def get_cache_dir() -> str:
+    """Directory holding arinja's local cache files."""
+    return os.path.expanduser(config.get('ARINJA_CACHE_DIR', DEFAULT_CACHE_DIR))
+
+class CachedPage(NamedTuple):
+    """A cached article page."""
+    content: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+class PageCache:
+    """SQLite-backed cache keyed by cleaned article URL.
+
+    Entries younger than ``fresh_for`` seconds are served without touching
+    the network. Older entries are revalidated with If-None-Match /
+    If-Modified-Since. ``evict`` drops entries not refreshed within
+    ``max_age`` seconds, then the least recently used entries until the
+    cache fits in ``max_bytes``.
+
+    ``stats`` counts ``hits`` (served without a request), ``revalidated``
+    (304 responses), ``misses`` and ``stores``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        fresh_for: Optional[float] = None,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        if path is None:
+            path = os.path.join(get_cache_dir(), 'pages.db')
+        if fresh_for is None:
+            fresh_for = config.get_float('ARINJA_PAGE_CACHE_FRESH_HOURS', DEFAULT_FRESH_HOURS) * 3600
+        if max_age is None:
+            max_age = config.get_float('ARINJA_PAGE_CACHE_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS) * 86400
+        if max_bytes is None:
+            max_bytes = int(config.get_float('ARINJA_PAGE_CACHE_MAX_MB', DEFAULT_MAX_MB) * 1024 * 1024)
+
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0}
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Look up a page, noting whether it can be served without revalidation."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, url))
+
+        content, etag, last_modified, fetched_at = row
+        fresh = now - fetched_at < self.fresh_for
+        if fresh:
+            self._count('hits')
+        return CachedPage(content, etag, last_modified, fresh)
+
+    def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store the extracted text of a freshly downloaded page."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO pages
+                (url, content, etag, last_modified, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (url, content, etag, last_modified, len(content.encode('utf-8')), now, now))
+            self.stats['stores'] += 1
+
+    def mark_revalidated(self, url: str):
+        """Record a 304 response: the cached entry is fresh again."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url)
+            )
+            self.stats['revalidated'] += 1
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over the size cap."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age,))
+            self._conn.execute("""
+                DELETE FROM pages WHERE url IN (
+                    SELECT url FROM (
+                        SELECT url, SUM(size) OVER (ORDER BY accessed_at DESC, url) AS running
+                        FROM pages
+                    ) WHERE running > ?
+                )
+            """, (self.max_bytes,))
+
+    def close(self):
+        """Apply eviction and close the cache file."""
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,18 @@
+"""Cursors for keyset pagination of article listings."""
+import datetime
+from typing import Dict, Tuple
+
+def make_cursor(article: Dict) -> str:
+    """Encode an article's position in listing order as a ``--before`` cursor."""
+    published_at = article.get('published_at')
+    stamp = published_at.isoformat() if published_at else '-infinity'
+    return f"{stamp}_{article['id']}"
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor from make_cursor, raising ValueError if malformed."""
+    stamp, sep, article_id = cursor.rpartition('_')
+    if not sep:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if stamp != '-infinity':
+        datetime.datetime.fromisoformat(stamp)
+    return stamp, int(article_id)
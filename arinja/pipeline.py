@@ -0,0 +1,356 @@
+"""Fetch pipeline: streams articles from GNews into the database.
+
+Kept out of cli.py so that read commands start without loading the HTTP,
+parsing and GNews stack.
+"""
+import datetime
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from rich.console import Console
+from rich.panel import Panel
+from rich.progress import Progress, SpinnerColumn, TextColumn
+from . import news, db, web
+from .extract import DEFAULT_PARSER, Extractor
+from .metrics import Metrics
+from .pagecache import PageCache
+from .readcache import ReadCache
+
+console = Console()
+
+# Articles stored and committed together while fetching
+DEFAULT_CHUNK_SIZE = 50
+# Days per GNews query in backfill mode
+DEFAULT_WINDOW_DAYS = 1
+
+class _UnitDone(NamedTuple):
+    """Queue marker sent after the last article of one fetch unit."""
+    category: str
+    start_date: Optional[datetime.date]
+    end_date: Optional[datetime.date]
+    count: int
+    skipped: int
+    ok: bool
+
+class FetchResources(NamedTuple):
+    """HTTP client, page cache and extraction pool shared by fetch runs."""
+    client: web.HttpClient
+    cache: Optional[PageCache]
+    extractor: Extractor
+
+def open_resources(
+    per_host: int = news.DEFAULT_PER_HOST,
+    max_page_bytes: int = web.DEFAULT_MAX_BYTES,
+    use_cache: bool = True,
+    refresh: bool = False,
+    extract_procs: int = 0,
+    parser: str = DEFAULT_PARSER
+) -> FetchResources:
+    """Create the resources for one or more fetch runs.
+
+    Raises ValueError for a parser that cannot be used.
+    """
+    # First, so a bad parser fails before anything else is opened
+    extractor = Extractor(processes=extract_procs, parser=parser)
+    return FetchResources(
+        client=web.HttpClient(per_host=per_host, max_bytes=max_page_bytes),
+        cache=PageCache(fresh_for=0 if refresh else None) if use_cache else None,
+        extractor=extractor
+    )
+
+def close_resources(resources: FetchResources):
+    """Release resources from open_resources."""
+    resources.extractor.close()
+    resources.client.close()
+    if resources.cache:
+        resources.cache.close()
+
+def _put(out: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put on the queue unless the consumer has stopped; don't block forever."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _stream_unit(
+    category: str,
+    from_date: Optional[datetime.date],
+    to_date: Optional[datetime.date],
+    since: Optional[datetime.datetime],
+    workers: int,
+    resources: FetchResources,
+    out: queue.Queue,
+    stop: threading.Event,
+    metrics: Metrics
+):
+    """Fetch one category/date range with its own NewsSource (and GNews state).
+
+    Articles are put on ``out`` as soon as their content is in, followed by
+    a _UnitDone marker.
+    """
+    source = news.NewsSource(start_date=from_date, end_date=to_date, workers=workers,
+                             client=resources.client, cache=resources.cache,
+                             extractor=resources.extractor, since=since, metrics=metrics)
+    
+    def find_stored(articles: List[Dict]) -> List[bool]:
+        metrics.count('db_calls')
+        return db.find_stored(articles)
+    
+    count = 0
+    for article in source.iter_headlines(category, skip_known=find_stored):
+        if not _put(out, article, stop):
+            return
+        count += 1
+    _put(out, _UnitDone(category, from_date, to_date, count, source.skipped, not source.failed), stop)
+
+def _windows(from_date: datetime.date, to_date: datetime.date, days: int) -> List[Tuple[datetime.date, datetime.date]]:
+    """Split an inclusive date range into windows of ``days`` days.
+
+    Window ends are exclusive, matching the GNews ``before:`` filter.
+    """
+    windows = []
+    start = from_date
+    while start <= to_date:
+        end = min(start + datetime.timedelta(days=days), to_date + datetime.timedelta(days=1))
+        windows.append((start, end))
+        start = end
+    return windows
+
+def fetch(
+    categories: List[str],
+    from_date: Optional[datetime.date] = None,
+    to_date: Optional[datetime.date] = None,
+    workers: int = news.DEFAULT_WORKERS,
+    per_host: int = news.DEFAULT_PER_HOST,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    refresh: bool = False,
+    extract_procs: int = 0,
+    parser: str = DEFAULT_PARSER,
+    max_page_bytes: int = web.DEFAULT_MAX_BYTES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backfill: bool = False,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    full: bool = False,
+    resources: Optional[FetchResources] = None,
+    metrics: Optional[Metrics] = None
+) -> Metrics:
+    """Fetch and index latest news for ``categories``.
+
+    Categories (``jobs`` at a time, all at once by default) are fetched in
+    parallel and their articles stream into the
+    database in chunks of ``chunk_size``, each committed on its own, so
+    memory stays flat and a failure only loses the current chunk.
+
+    Without dates, each category only asks GNews for articles published
+    since its watermark, the start of its last successful undated fetch
+    (unless ``full`` is set or the watermark is over a week old).
+
+    With ``backfill``, the date range is split into ``window_days`` windows
+    that are fetched concurrently. Each finished window is checkpointed in
+    the database after its articles are committed, and checkpointed windows
+    are skipped, so an interrupted backfill resumes where it stopped.
+
+    Pass ``resources`` to reuse an HTTP client, page cache and extraction
+    pool across runs; otherwise they are created from the other arguments
+    and closed at the end.
+
+    Returns the run's metrics: time per stage (summed over threads), per-host
+    download latencies, and counters for articles, HTTP, the page cache and
+    database calls. Pass ``metrics`` to record into an existing instance.
+    """
+    metrics = metrics or Metrics()
+    run_started = news.get_current_ist_time()
+    jobs = jobs or len(categories)
+    incremental = not backfill and not from_date and not to_date
+    
+    if backfill:
+        to_date = to_date or run_started.date()
+        windows = _windows(from_date, to_date, window_days)
+        metrics.count('db_calls')
+        done_windows = db.get_completed_windows(categories, from_date, to_date + datetime.timedelta(days=1))
+        units = [
+            (category, start, end, None)
+            for start, end in windows
+            for category in categories
+            if (category, start, end) not in done_windows
+        ]
+        resumed = len(windows) * len(categories) - len(units)
+    else:
+        watermarks = {}
+        if incremental and not full:
+            metrics.count('db_calls')
+            watermarks = db.get_watermarks(categories)
+        units = [(category, from_date, to_date, watermarks.get(category)) for category in categories]
+        resumed = 0
+    unit_totals = {category: sum(1 for unit in units if unit[0] == category) for category in categories}
+    
+    # One HTTP client, page cache and extraction pool for the whole run so
+    # per-host limits and circuit breakers apply across categories
+    owns_resources = resources is None
+    if owns_resources:
+        resources = open_resources(per_host, max_page_bytes, use_cache, refresh, extract_procs, parser)
+    client, cache = resources.client, resources.cache
+    reads = ReadCache()
+    
+    def store(chunk: List[Dict]) -> int:
+        metrics.count('db_calls')
+        with metrics.stage('store'):
+            ids = db.store_articles(chunk)
+        # Later reads of these articles skip the database, and cached
+        # listings of their categories are out of date. Cached articles are
+        # never re-read, so nothing is cached unless every article has its id
+        with metrics.stage('read_cache'):
+            if len(ids) == len(chunk):
+                reads.put_articles([dict(article, id=article_id) for article, article_id in zip(chunk, ids)])
+            reads.invalidate_listings(sorted({article['category'] for article in chunk}))
+        return len(ids)
+    
+    articles_queue: queue.Queue = queue.Queue(maxsize=chunk_size * 2)
+    stop = threading.Event()
+    fetched = 0
+    stored = 0
+    skipped = 0
+    failed = 0
+    new_counts = {category: 0 for category in categories}
+    skipped_counts = {category: 0 for category in categories}
+    units_done = {category: 0 for category in categories}
+    
+    def describe(category: str) -> str:
+        windows_text = f"{units_done[category]}/{unit_totals[category]} windows, " if backfill else ""
+        return f"{category}: {windows_text}{new_counts[category]} new, {skipped_counts[category]} already stored"
+    
+    try:
+        with Progress(SpinnerColumn(finished_text="[green]✓[/green]"), TextColumn("[progress.description]{task.description}"), console=console) as progress:
+            date_range = f" ({from_date} to {to_date})" if from_date and to_date else ""
+            tasks = {
+                category: progress.add_task(f"[dim]{category}: queued{date_range}[/dim]", total=None)
+                for category in categories
+            }
+            for category in categories:
+                if not unit_totals[category]:
+                    progress.update(tasks[category], description=f"{category}: all windows already done",
+                                    total=1, completed=1)
+            store_task = progress.add_task("Storing articles...", total=None)
+            
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    executor.submit(_stream_unit, category, start, end, since, workers, resources,
+                                    articles_queue, stop, metrics): (category, start, end)
+                    for category, start, end, since in units
+                }
+                pending = set(futures)
+                chunk: List[Dict] = []
+                
+                try:
+                    # Producers finish only after their last put, so once
+                    # nothing is pending the queue holds everything left
+                    while pending or not articles_queue.empty():
+                        try:
+                            item = articles_queue.get(timeout=0.1)
+                        except queue.Empty:
+                            item = None
+                        
+                        if isinstance(item, _UnitDone):
+                            # Commit the unit's articles before checkpointing it
+                            if chunk:
+                                stored += store(chunk)
+                                chunk = []
+                            if not item.ok:
+                                failed += 1
+                            elif backfill or incremental:
+                                metrics.count('db_calls')
+                                with metrics.stage('checkpoint'):
+                                    if backfill:
+                                        db.mark_window_complete(item.category, item.start_date, item.end_date, item.count)
+                                    else:
+                                        db.set_watermark(item.category, run_started)
+                            skipped += item.skipped
+                            skipped_counts[item.category] += item.skipped
+                            units_done[item.category] += 1
+                            finished = units_done[item.category] == unit_totals[item.category]
+                            description = describe(item.category)
+                            if not item.ok:
+                                window = f" {item.start_date} to {item.end_date}" if backfill else ""
+                                description = f"[red]{item.category}{window}: GNews query failed[/red]"
+                            progress.update(tasks[item.category], description=description,
+                                            total=1 if finished else None, completed=1 if finished else 0)
+                        elif item is not None:
+                            chunk.append(item)
+                            fetched += 1
+                            new_counts[item['category']] += 1
+                            progress.update(tasks[item['category']], description=describe(item['category']))
+                        
+                        if len(chunk) >= chunk_size:
+                            stored += store(chunk)
+                            chunk = []
+                        progress.update(store_task, description=f"Stored {stored} articles...")
+                        
+                        for future in [f for f in pending if f.done()]:
+                            pending.discard(future)
+                            category, start, end = futures[future]
+                            try:
+                                future.result()
+                            except Exception as e:
+                                failed += 1
+                                window = f" {start} to {end}" if backfill else ""
+                                progress.update(tasks[category], description=f"[red]{category}{window}: failed ({e})[/red]")
+                    
+                    if chunk:
+                        stored += store(chunk)
+                finally:
+                    stop.set()
+            
+            progress.update(store_task, description=f"Stored {stored} articles", total=1, completed=1)
+    finally:
+        reads.evict()
+        reads.close()
+        if owns_resources:
+            close_resources(resources)
+    
+    stats = client.stats
+    metrics.count('articles_fetched', fetched)
+    metrics.count('articles_stored', stored)
+    metrics.count('articles_skipped', skipped)
+    metrics.count('units_failed', failed)
+    for name, value in stats.items():
+        metrics.count(f'http_{name}', value)
+    if cache:
+        for name, value in cache.stats.items():
+            metrics.count(f'page_cache_{name}', value)
+    
+    summary = (
+        f"✓ Fetched {fetched} articles\n"
+        f"✓ Skipped {skipped} already stored articles\n"
+        f"✓ New/updated articles: {stored}\n"
+    )
+    if backfill:
+        summary += f"✓ Windows: {len(units) - failed} fetched, {resumed} already done, {failed} failed\n"
+    elif failed:
+        summary += f"[red]✗ {failed} categories failed[/red]\n"
+    summary += (
+        f"[dim]HTTP: {stats['hits']} requests, {stats['retries']} retries, "
+        f"{stats['trips']} hosts skipped ({stats['skipped']} requests avoided), "
+        f"{stats['truncated']} pages over size cap, {stats['rejected']} non-HTML[/dim]"
+    )
+    if cache:
+        summary += (
+            f"\n[dim]Cache: {cache.stats['hits']} fresh, "
+            f"{cache.stats['revalidated']} revalidated, {cache.stats['stores']} stored[/dim]"
+        )
+    busiest = sorted(metrics.stages.items(), key=lambda item: -item[1][1])[:4]
+    if busiest:
+        summary += "\n[dim]Time (summed over threads): " + ", ".join(
+            f"{name} {seconds:.1f}s" for name, (_, seconds) in busiest
+        ) + "[/dim]"
+    
+    console.print(Panel(
+        summary,
+        title="[green]Update Complete[/green]",
+        border_style="green"
+    ))
+    return metrics
@@ -0,0 +1,148 @@
+"""On-disk cache of stored articles and category listings for read commands."""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from . import config
+from .pagecache import get_cache_dir
+
+# Cache defaults, overridable in config/config.env
+DEFAULT_LISTING_MINUTES = 10.0
+DEFAULT_MAX_AGE_DAYS = 30.0
+
+# Columns of db.get_article_by_id rows
+ARTICLE_FIELDS = (
+    'id', 'title', 'source', 'published_at', 'content', 'category', 'url', 'fetch_status', 'http_status'
+)
+
+def _encode(article: Dict) -> Dict:
+    published_at = article.get('published_at')
+    return dict(article, published_at=published_at.isoformat() if published_at else None)
+
+def _decode(article: Dict) -> Dict:
+    published_at = article.get('published_at')
+    return dict(article, published_at=datetime.datetime.fromisoformat(published_at) if published_at else None)
+
+def _listing_key(category: str, collapse: bool) -> str:
+    return f"{category}:collapsed" if collapse else category
+
+class ReadCache:
+    """SQLite-backed copy of articles and listing pages read from Postgres.
+
+    Stored articles never change, so cached articles are served until they
+    go unread for ``max_age`` seconds. Listing pages go stale as new
+    articles arrive: they are served for ``listing_ttl`` seconds (longer
+    only when offline), and ``invalidate_listings`` drops a category's
+    pages as soon as a fetch commits articles for it.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        listing_ttl: Optional[float] = None,
+        max_age: Optional[float] = None
+    ):
+        if path is None:
+            path = os.path.join(get_cache_dir(), 'reads.db')
+        if listing_ttl is None:
+            listing_ttl = config.get_float('ARINJA_READ_CACHE_LISTING_MINUTES', DEFAULT_LISTING_MINUTES) * 60
+        if max_age is None:
+            max_age = config.get_float('ARINJA_READ_CACHE_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS) * 86400
+
+        self.listing_ttl = listing_ttl
+        self.max_age = max_age
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                data TEXT NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS listings (
+                category TEXT NOT NULL,
+                page_limit INTEGER NOT NULL,
+                before TEXT NOT NULL,
+                data TEXT NOT NULL,
+                cached_at REAL NOT NULL,
+                PRIMARY KEY (category, page_limit, before)
+            )
+        """)
+
+    def get_article(self, article_id: int) -> Optional[Dict]:
+        """Look up a cached article by id."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM articles WHERE id = ?", (article_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE articles SET accessed_at = ? WHERE id = ?", (time.time(), article_id))
+        return _decode(json.loads(row[0]))
+
+    def put_articles(self, articles: List[Dict]):
+        """Cache full article rows, each with its database ``id``."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO articles (id, data, accessed_at) VALUES (?, ?, ?)",
+                [
+                    (article['id'], json.dumps(_encode({f: article.get(f) for f in ARTICLE_FIELDS})), now)
+                    for article in articles
+                ]
+            )
+
+    def get_listing(self, category: str, limit: int, before: Optional[str] = None,
+                    stale_ok: bool = False, collapse: bool = False) -> Optional[List[Dict]]:
+        """Look up a cached listing page; expired pages only with ``stale_ok``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, cached_at FROM listings WHERE category = ? AND page_limit = ? AND before = ?",
+                (_listing_key(category, collapse), limit, before or '')
+            ).fetchone()
+        if row is None or (not stale_ok and time.time() - row[1] >= self.listing_ttl):
+            return None
+        return [_decode(article) for article in json.loads(row[0])]
+
+    def put_listing(self, category: str, limit: int, before: Optional[str], articles: List[Dict],
+                    collapse: bool = False):
+        """Cache a listing page as returned by db.get_articles."""
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO listings (category, page_limit, before, data, cached_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (_listing_key(category, collapse), limit, before or '', json.dumps([_encode(a) for a in articles]), time.time()))
+
+    def invalidate_listings(self, categories: List[str]):
+        """Drop cached listing pages of categories that gained articles."""
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM listings WHERE category IN (?, ?)",
+                [(c, _listing_key(c, True)) for c in categories]
+            )
+
+    def forget_articles(self, published_before: datetime.datetime):
+        """Drop cached articles published before a time, as db.prune_articles does."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM articles WHERE json_extract(data, '$.published_at') < ?",
+                (published_before.isoformat(),)
+            )
+
+    def evict(self):
+        """Drop articles unread and listing pages unrefreshed for max_age."""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            self._conn.execute("DELETE FROM articles WHERE accessed_at < ?", (cutoff,))
+            self._conn.execute("DELETE FROM listings WHERE cached_at < ?", (cutoff,))
+
+    def close(self):
+        """Close the cache file."""
+        with self._lock:
+            self._conn.close()
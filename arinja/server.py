@@ -0,0 +1,334 @@
+"""Local HTTP/JSON API over the article database, for `arinja serve`.
+
+Other tools read articles from here instead of running the CLI once per
+lookup, so they skip Python and connection startup on every call. Requests
+run in threads that share the db connection pool. Listing responses are
+kept, already encoded, in an in-memory cache until a commit adds articles
+to their category: store_articles, imports and prunes notify
+db.ARTICLES_CHANNEL, and a listener thread drops the affected listings.
+
+    GET /articles?category=&from=&to=&limit=&before=&collapse=1
+    GET /articles/<id>
+    GET /articles/<id>/source
+    GET /search?q=&category=&from=&to=&limit=
+    GET /stats
+"""
+import datetime
+import json
+import select
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import psycopg2
+import psycopg2.extensions
+from . import config, db
+from .paging import make_cursor, parse_cursor
+
+# Server defaults, overridable in config/config.env or on the command line
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_CACHE_SECONDS = 300.0
+DEFAULT_CACHE_ENTRIES = 1024
+# Largest page a client may ask for
+MAX_LIMIT = db.LISTING_BATCH_SIZE
+# Seconds between attempts to reconnect the change listener
+LISTEN_RETRY = 5.0
+
+class ListingCache:
+    """LRU of encoded listing responses, each served for ``ttl`` seconds.
+
+    Entries are filed under their category (None for listings across all
+    categories), so a change to one category drops only its listings and
+    the cross-category ones. A response loaded while a change arrived may
+    predate it, so ``put`` ignores it unless ``token`` is still current.
+    The cache is bypassed while ``active`` is off, i.e. while changes
+    cannot be heard.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_SECONDS, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.active = True
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[Optional[str], float, bytes]]' = OrderedDict()
+        self._generation = 0
+
+    def token(self) -> int:
+        """Mark the start of a load; pass the result to put."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Look up a fresh response."""
+        with self._lock:
+            entry = self._entries.get(key) if self.active else None
+            if entry is None or time.monotonic() >= entry[1]:
+                if entry is not None:
+                    del self._entries[key]
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[2]
+
+    def put(self, key: Hashable, category: Optional[str], body: bytes, token: int):
+        """Cache a response loaded since ``token``, evicting the least recently used."""
+        with self._lock:
+            if not self.active or token != self._generation:
+                return
+            self._entries[key] = (category, time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, categories: Optional[List[str]] = None):
+        """Drop listings of categories that changed; all of them without categories."""
+        with self._lock:
+            self._generation += 1
+            self.stats['invalidations'] += 1
+            if not categories:
+                self._entries.clear()
+                return
+            changed = set(categories)
+            for key in [k for k, (category, _, _) in self._entries.items()
+                        if category is None or category in changed]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class ChangeListener(threading.Thread):
+    """Invalidates a ListingCache on notifications from db.ARTICLES_CHANNEL.
+
+    Holds its own connection, outside the pool. While it is disconnected
+    the cache is switched off, since changes would go unnoticed.
+    """
+
+    def __init__(self, dsn: str, cache: ListingCache, retry: float = LISTEN_RETRY):
+        super().__init__(name='arinja-listener', daemon=True)
+        self.dsn = dsn
+        self.cache = cache
+        self.retry = retry
+        self.listening = threading.Event()
+        self._stopping = threading.Event()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error:
+                pass
+            self.listening.clear()
+            self.cache.active = False
+            self._stopping.wait(self.retry)
+
+    def _listen(self):
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {db.ARTICLES_CHANNEL}")
+            # Anything cached before now may have missed a change
+            self.cache.invalidate()
+            self.cache.active = True
+            self.listening.set()
+            while not self._stopping.is_set():
+                # Wake up now and then to notice stop()
+                if not select.select([conn], [], [], 1.0)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    self.cache.invalidate([c for c in payload.split(',') if c])
+        finally:
+            conn.close()
+
+    def stop(self):
+        """Stop listening and wait for the thread to finish."""
+        self._stopping.set()
+        self.join()
+
+class BadRequest(ValueError):
+    """A request with a missing or malformed parameter."""
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+def encode(data) -> bytes:
+    """Encode a response body."""
+    return json.dumps(data, default=_json_default, ensure_ascii=False).encode('utf-8')
+
+def _param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[-1] if values and values[-1] != '' else None
+
+def _date_param(params: Dict[str, List[str]], name: str, end_of_day: bool = False) -> Optional[datetime.datetime]:
+    """Parse a YYYY-MM-DD parameter; an end date includes its whole day."""
+    value = _param(params, name)
+    if value is None:
+        return None
+    try:
+        date = datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise BadRequest(f"Invalid {name} date '{value}'. Use YYYY-MM-DD")
+    return date.replace(hour=23, minute=59, second=59) if end_of_day else date
+
+def _limit_param(params: Dict[str, List[str]]) -> int:
+    value = _param(params, 'limit')
+    try:
+        limit = int(value) if value else 20
+    except ValueError:
+        raise BadRequest(f"Invalid limit '{value}'")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to the db read functions."""
+
+    # Keep connections open between requests, and send each response as
+    # soon as it is written instead of waiting on the client's ACK
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: 'ApiServer'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+        try:
+            if parts == ['articles']:
+                self._send(200, self.server.listing(params))
+            elif len(parts) in (2, 3) and parts[0] == 'articles' and parts[1].isdigit() \
+                    and parts[2:] in ([], ['source']):
+                article = db.get_article_by_id(int(parts[1]))
+                if article is None:
+                    self._error(404, f"Article {parts[1]} not found")
+                elif len(parts) == 3:
+                    self._send(200, encode({k: article[k] for k in ('id', 'source', 'url')}))
+                else:
+                    self._send(200, encode(article))
+            elif parts == ['search']:
+                self._send(200, self.server.search(params))
+            elif parts == ['stats']:
+                self._send(200, encode(self.server.stats()))
+            else:
+                self._error(404, f"Unknown path {url.path}")
+        except BadRequest as e:
+            self._error(400, str(e))
+        except psycopg2.Error as e:
+            self._error(503, f"Database error: {e}".strip())
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send(status, encode({'error': message}))
+
+    def log_message(self, *args):
+        # No per-request logging; it would cost more than a cached response
+        pass
+
+class ApiServer(ThreadingHTTPServer):
+    """HTTP server answering from the database through a ListingCache."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], categories: List[str], cache: ListingCache,
+                 listener: Optional[ChangeListener] = None):
+        super().__init__(address, ApiHandler)
+        self.categories = list(categories)
+        self.cache = cache
+        self.listener = listener
+
+    def _category(self, params: Dict[str, List[str]]) -> Optional[str]:
+        category = _param(params, 'category')
+        if category and category.lower() not in self.categories:
+            raise BadRequest(f"Unknown category '{category}'. Choose from: {', '.join(self.categories)}")
+        return category.lower() if category else None
+
+    def listing(self, params: Dict[str, List[str]]) -> bytes:
+        """A page of db.get_articles, with the cursor of the next page."""
+        category = self._category(params)
+        from_date = _date_param(params, 'from')
+        to_date = _date_param(params, 'to', end_of_day=True)
+        limit = _limit_param(params)
+        before = _param(params, 'before')
+        if before:
+            try:
+                parse_cursor(before)
+            except ValueError:
+                raise BadRequest(f"Invalid cursor '{before}'")
+        collapse = _param(params, 'collapse') in ('1', 'true', 'yes')
+
+        key = (category, from_date, to_date, limit, before, collapse)
+        body = self.cache.get(key)
+        if body is None:
+            token = self.cache.token()
+            articles = db.get_articles(category, from_date, to_date, limit, before, collapse)
+            body = encode({
+                'articles': articles,
+                'next': make_cursor(articles[-1]) if len(articles) == limit else None
+            })
+            self.cache.put(key, category, body, token)
+        return body
+
+    def search(self, params: Dict[str, List[str]]) -> bytes:
+        """Results of db.search_articles, not cached."""
+        query = _param(params, 'q')
+        if not query:
+            raise BadRequest("Missing search query q")
+        return encode({'articles': db.search_articles(
+            query, self._category(params), _date_param(params, 'from'),
+            _date_param(params, 'to', end_of_day=True), _limit_param(params)
+        )})
+
+    def stats(self) -> Dict:
+        """Cache counters and whether invalidations are being received."""
+        return dict(
+            self.cache.stats,
+            cached=len(self.cache),
+            listening=self.listener is not None and self.listener.listening.is_set()
+        )
+
+    def close(self):
+        """Stop the change listener and release sockets and pooled connections."""
+        if self.listener is not None:
+            self.listener.stop()
+        self.server_close()
+        db.close_pool()
+
+def start(
+    categories: List[str],
+    host: str = DEFAULT_HOST,
+    port: Optional[int] = None,
+    cache_seconds: Optional[float] = None,
+    cache_entries: Optional[int] = None
+) -> ApiServer:
+    """Bind the API server and start listening for article changes.
+
+    The caller runs ``serve_forever`` and then ``close``. Listings are not
+    cached until the listener has connected.
+    """
+    if port is None:
+        port = config.get_int('ARINJA_SERVE_PORT', DEFAULT_PORT)
+    if cache_seconds is None:
+        cache_seconds = config.get_float('ARINJA_SERVE_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+    if cache_entries is None:
+        cache_entries = config.get_int('ARINJA_SERVE_CACHE_ENTRIES', DEFAULT_CACHE_ENTRIES)
+
+    cache = ListingCache(ttl=cache_seconds, max_entries=cache_entries)
+    cache.active = False
+    listener = ChangeListener(db.get_postgres_uri(), cache)
+    server = ApiServer((host, port), categories, cache, listener)
+    listener.start()
+    return server
@@ -0,0 +1,233 @@
+"""Shared HTTP session with retries and per-host circuit breaking."""
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+# Set up headers to mimic a browser
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Status codes worth retrying; anything else is returned to the caller as is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Content types worth parsing; anything else is rejected before download
+HTML_TYPES = {'text/html', 'application/xhtml+xml'}
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_PER_HOST = 2
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+DEFAULT_FAILURE_THRESHOLD = 3
+# Retries allowed per run: a fixed allowance plus a share of all requests
+DEFAULT_RETRY_BUDGET = 0.2
+MIN_RETRY_BUDGET = 10
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of contacting a host that has failed repeatedly."""
+
+class UnsupportedContentError(requests.RequestException):
+    """Raised for responses that are not HTML pages."""
+
+class HttpClient:
+    """Keep-alive HTTP client shared by all article downloads in a run.
+
+    Each host gets a small pool of persistent connections and at most
+    ``per_host`` requests in flight. Timeouts, connection errors and
+    429/5xx responses are retried with jittered exponential backoff, as long
+    as the run-wide retry budget allows. After ``failure_threshold``
+    consecutive failures a host's circuit opens and it is skipped for the
+    rest of the run.
+
+    ``read_html`` streams a response body, rejecting non-HTML content types
+    and keeping at most ``max_bytes`` of it; ``get_html`` does both.
+
+    ``stats`` counts ``hits`` (requests sent), ``retries``, ``failures``,
+    ``trips`` (circuits opened), ``skipped`` (requests refused by an open
+    circuit), ``truncated`` (bodies cut at ``max_bytes``), ``rejected``
+    (non-HTML responses) and ``bytes`` (body bytes read).
+    """
+
+    def __init__(
+        self,
+        per_host: int = DEFAULT_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        retry_budget: float = DEFAULT_RETRY_BUDGET,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.failure_threshold = max(1, failure_threshold)
+        self.retry_budget = retry_budget
+        self.max_bytes = max_bytes
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=self.per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.stats = {
+            'hits': 0, 'retries': 0, 'failures': 0, 'trips': 0, 'skipped': 0,
+            'truncated': 0, 'rejected': 0, 'bytes': 0
+        }
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_failures: Dict[str, int] = {}
+        self._open_hosts = set()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent requests to a host."""
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def is_open(self, host: str) -> bool:
+        """Whether the circuit for a host has tripped."""
+        with self._lock:
+            return host in self._open_hosts
+
+    def _record_success(self, host: str):
+        with self._lock:
+            self._host_failures[host] = 0
+
+    def _record_failure(self, host: str):
+        with self._lock:
+            self.stats['failures'] += 1
+            failures = self._host_failures.get(host, 0) + 1
+            self._host_failures[host] = failures
+            if failures >= self.failure_threshold and host not in self._open_hosts:
+                self._open_hosts.add(host)
+                self.stats['trips'] += 1
+
+    def _take_retry(self) -> bool:
+        """Reserve a retry from the run-wide budget."""
+        with self._lock:
+            allowed = MIN_RETRY_BUDGET + self.retry_budget * self.stats['hits']
+            if self.stats['retries'] >= allowed:
+                return False
+            self.stats['retries'] += 1
+            return True
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Backoff before the given retry, honouring a numeric Retry-After."""
+        delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.timeout))
+        return delay
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET a URL with retries, raising CircuitOpenError for skipped hosts."""
+        return self._request(url, False, **kwargs)[0]
+
+    def get_html(self, url: str, **kwargs) -> Tuple[requests.Response, Optional[str]]:
+        """GET a page with retries and read it as read_html does.
+
+        The body is read while the request still holds its host slot, so
+        ``per_host`` bounds downloads and not just response headers. Returns
+        the closed response and its text, or None for the text of a 304 or
+        error response.
+        """
+        kwargs['stream'] = True
+        return self._request(url, True, **kwargs)
+
+    def _request(self, url: str, read: bool, **kwargs) -> Tuple[requests.Response, Optional[str]]:
+        host = urlparse(url).netloc.lower()
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+
+        while True:
+            if self.is_open(host):
+                self._count('skipped')
+                raise CircuitOpenError(f"Skipping {host} after repeated failures")
+
+            self._count('hits')
+            error = None
+            response = None
+            text = None
+            try:
+                with self._host_slot(host):
+                    response = self.session.get(url, **kwargs)
+                    if read:
+                        if response.ok and response.status_code != 304:
+                            text = self.read_html(response)
+                        else:
+                            response.close()
+            except UnsupportedContentError:
+                # The host answered; only the page is unusable
+                self._record_success(host)
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                response = None
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                self._record_success(host)
+                return response, text
+
+            if attempt >= self.max_retries or not self._take_retry():
+                self._record_failure(host)
+                if error is not None:
+                    raise error
+                return response, text
+
+            attempt += 1
+            delay = self._delay(attempt, response)
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    def read_html(self, response: requests.Response) -> str:
+        """Read an HTML body from a ``stream=True`` response, up to max_bytes."""
+        try:
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type and content_type not in HTML_TYPES:
+                self._count('rejected')
+                raise UnsupportedContentError(f"Unsupported content type: {content_type}")
+            
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_bytes:
+                    self._count('truncated')
+                    break
+        finally:
+            response.close()
+        
+        with self._lock:
+            self.stats['bytes'] += size
+        data = b''.join(chunks)[:self.max_bytes]
+        return data.decode(response.encoding or 'utf-8', errors='replace')
+
+    def reset(self):
+        """Close circuits and zero counters, keeping pooled connections."""
+        with self._lock:
+            self._host_failures.clear()
+            self._open_hosts.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
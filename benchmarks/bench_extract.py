@@ -0,0 +1,29 @@
+"""Article text extraction cost per corpus page."""
+import time
+from typing import Dict, List
+
+from arinja import extract, web
+from .corpus import article_page, huge_page
+
+PAGES = 60
+
+def _mean_ms(pages: List[str]) -> float:
+    started = time.perf_counter()
+    for page in pages:
+        extract.extract_text(page)
+    return (time.perf_counter() - started) * 1000 / len(pages)
+
+def run(pages: int = PAGES) -> Dict[str, float]:
+    corpus = [article_page(number) for number in range(pages)]
+    # A huge page as fetch hands it over: cut at the download size cap
+    huge = [huge_page(0)[:web.DEFAULT_MAX_BYTES]] * 5
+    extract.extract_text(corpus[0])
+
+    return {
+        'extract_ms_per_page': _mean_ms(corpus),
+        'extract_huge_ms': _mean_ms(huge),
+        'extract_page_kb': sum(len(page) for page in corpus) / len(corpus) / 1024,
+    }
+
+if __name__ == '__main__':
+    print(run())
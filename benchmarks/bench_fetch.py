@@ -0,0 +1,30 @@
+"""Headline fetch throughput: NewsSource.fetch_headlines against the corpus."""
+import time
+from typing import Dict
+
+from arinja import news, web
+from .corpus import CorpusServer
+from .fakes import fake_gnews
+
+ARTICLES = 200
+
+def run(articles: int = ARTICLES) -> Dict[str, float]:
+    with CorpusServer() as server:
+        urls = [url for _, url in server.feed_urls(articles)]
+        client = web.HttpClient()
+        with fake_gnews(urls):
+            source = news.NewsSource(client=client)
+            started = time.perf_counter()
+            results = source.fetch_headlines('technology')
+            elapsed = time.perf_counter() - started
+        client.close()
+
+    return {
+        'fetch_articles_per_sec': len(results) / elapsed,
+        'fetch_requests': client.stats['hits'],
+        'fetch_retries': client.stats['retries'],
+        'fetch_hosts_tripped': client.stats['trips'],
+    }
+
+if __name__ == '__main__':
+    print(run())
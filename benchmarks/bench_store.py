@@ -0,0 +1,125 @@
+"""Storage throughput and read latency against a throwaway database."""
+import datetime
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from arinja import bulk, db
+from arinja.cli import CATEGORIES
+from arinja.readcache import ReadCache
+from .corpus import paragraph
+from .postgres import throwaway_postgres
+
+ROWS = 5000
+READS = 200
+CLI_RUNS = 5
+
+def synthetic_articles(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 1, 1)
+    return [
+        {
+            'title': f"Synthetic headline {seed}-{number}",
+            'source': f"Publisher {number % 7}",
+            'published_at': start + datetime.timedelta(minutes=number * 7),
+            'content': '\n\n'.join(paragraph(rng) for _ in range(6)),
+            'category': CATEGORIES[number % len(CATEGORIES)],
+            'url': f"https://publisher{number % 7}.example/{seed}/{number}",
+        }
+        for number in range(count)
+    ]
+
+def _mean_ms(call: Callable[[int], object], runs: int = READS) -> float:
+    started = time.perf_counter()
+    for run in range(runs):
+        call(run)
+    return (time.perf_counter() - started) * 1000 / runs
+
+def _cli_ms(args: Callable[[int], List[str]], env: Dict[str, str]) -> float:
+    """Median wall time of arinja invocations, startup included."""
+    times = []
+    for run in range(CLI_RUNS):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'arinja', *args(run)], env=env,
+                       capture_output=True, check=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+def run(rows: int = ROWS) -> Dict[str, float]:
+    with throwaway_postgres() as uri:
+        if uri is None:
+            print("Skipping storage benchmarks: set ARINJA_BENCH_POSTGRES_URI or put initdb on PATH")
+            return {}
+
+        articles = synthetic_articles(rows)
+        ids: List[int] = []
+        started = time.perf_counter()
+        for start in range(0, rows, db.STORE_BATCH_SIZE):
+            ids.extend(db.store_articles(articles[start:start + db.STORE_BATCH_SIZE]))
+        store_elapsed = time.perf_counter() - started
+
+        # Re-storing the same rows takes the duplicate path
+        started = time.perf_counter()
+        for start in range(0, rows, db.STORE_BATCH_SIZE):
+            db.store_articles(articles[start:start + db.STORE_BATCH_SIZE])
+        dupe_elapsed = time.perf_counter() - started
+
+        first_page = db.get_articles('technology', limit=20)
+        cursor = db.make_cursor(first_page[-1])
+        some_id = ids[-1]
+
+        metrics = {
+            'store_rows_per_sec': rows / store_elapsed,
+            'store_duplicates_rows_per_sec': rows / dupe_elapsed,
+            'read_list_ms': _mean_ms(lambda run: db.get_articles(CATEGORIES[run % len(CATEGORIES)], limit=20)),
+            'read_next_page_ms': _mean_ms(lambda run: db.get_articles('technology', limit=20, before=cursor)),
+            'read_article_ms': _mean_ms(lambda run: db.get_article_by_id(some_id - run)),
+            'read_search_ms': _mean_ms(lambda run: db.search_articles('budget growth', limit=20), runs=50),
+        }
+
+        # On-disk size (heap and TOAST, without indexes) of the hot table and the
+        # bodies, summed over partitions when articles is partitioned (for a
+        # plain table pg_partition_tree lists nothing)
+        with db.get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT COALESCE((SELECT sum(pg_table_size(relid)) FROM pg_partition_tree('articles')), "
+                    "pg_table_size('articles')), pg_table_size('article_bodies')"
+                )
+                articles_bytes, bodies_bytes = cur.fetchone()
+        metrics['articles_table_kb'] = int(articles_bytes) / 1024
+        metrics['article_bodies_table_kb'] = bodies_bytes / 1024
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            reads = ReadCache(path=os.path.join(cache_dir, 'bench-reads.db'))
+            reads.put_articles([dict(article, id=article_id) for article, article_id in zip(articles, ids)])
+            metrics['read_cache_article_ms'] = _mean_ms(lambda run: reads.get_article(ids[run]))
+            reads.close()
+
+            # Dump the table both ways, then restore it from the CSV dump
+            for fmt in bulk.FORMATS:
+                path = os.path.join(cache_dir, f'articles.{fmt}')
+                started = time.perf_counter()
+                bulk.export_articles(path)
+                metrics[f'export_{fmt}_rows_per_sec'] = rows / (time.perf_counter() - started)
+            with db.get_db_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("TRUNCATE articles, article_bodies")
+                conn.commit()
+            started = time.perf_counter()
+            bulk.import_articles(os.path.join(cache_dir, 'articles.csv'))
+            metrics['import_rows_per_sec'] = rows / (time.perf_counter() - started)
+
+            # Each article is read from the database once, then from the cache
+            env = dict(os.environ, POSTGRES_URI=uri, ARINJA_CACHE_DIR=cache_dir)
+            metrics['cli_article_ms'] = _cli_ms(lambda run: [str(ids[run])], env)
+            metrics['cli_cached_article_ms'] = _cli_ms(lambda run: ['--offline', str(ids[run])], env)
+        return metrics
+
+if __name__ == '__main__':
+    print(run())
@@ -0,0 +1,157 @@
+"""Publisher page corpus and the local HTTP servers that serve it.
+
+Pages are generated deterministically and shaped like real publisher pages:
+inline scripts, navigation, an article container, related-story asides and
+a footer. Besides ordinary pages the corpus has slow, huge, failing,
+missing and non-HTML entries so that fetch benchmarks exercise timeouts,
+the page size cap, retries and the circuit breaker.
+"""
+import functools
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+# Seconds a slow page waits before responding
+SLOW_DELAY = 1.0
+# Size of a huge page, well over web.DEFAULT_MAX_BYTES
+HUGE_BYTES = 6 * 1024 * 1024
+
+# Share of each kind in a feed, per 100 articles
+FEED_MIX = [
+    ('article', 80),
+    ('slow', 5),
+    ('huge', 3),
+    ('fail', 7),
+    ('missing', 3),
+    ('pdf', 2),
+]
+
+WORDS = (
+    "government market company minister city police court report growth "
+    "players season election budget research hospital students technology "
+    "launch investors policy water climate match film series health energy "
+    "district officials statement analysts quarter project rail airport"
+).split()
+
+def sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(12, 24))]
+    return ' '.join(words).capitalize() + '.'
+
+def paragraph(rng: random.Random) -> str:
+    return ' '.join(sentence(rng) for _ in range(rng.randint(3, 6)))
+
+def article_page(number: int, paragraphs: int = 0) -> str:
+    """A publisher article page; the same number always gives the same page."""
+    rng = random.Random(number)
+    paragraphs = paragraphs or rng.randint(8, 20)
+    script = 'var config = {' + ', '.join(f'"k{i}": {rng.random()}' for i in range(rng.randint(200, 800))) + '};'
+    nav = ''.join(f'<li><a href="/section/{i}">{rng.choice(WORDS).title()}</a></li>' for i in range(40))
+    body = ''.join(f'<p>{paragraph(rng)}</p>' for _ in range(paragraphs))
+    related = ''.join(
+        f'<div class="card"><a href="/article/{rng.randint(0, 10 ** 6)}">{sentence(rng)}</a><p>{sentence(rng)}</p></div>'
+        for _ in range(rng.randint(10, 30))
+    )
+    return (
+        f'<!DOCTYPE html><html><head><title>{sentence(rng)}</title>'
+        f'<script>{script}</script><style>.card {{ margin: 0 }}</style></head>'
+        f'<body><header><nav><ul>{nav}</ul></nav></header>'
+        f'<main><article><h1>{sentence(rng)}</h1><div class="byline">Staff reporter</div>{body}</article>'
+        f'<aside class="related">{related}</aside></main>'
+        f'<footer><p>{paragraph(rng)}</p></footer></body></html>'
+    )
+
+@functools.lru_cache(maxsize=4)
+def huge_page(number: int) -> str:
+    """An article page padded with comments and markup past HUGE_BYTES."""
+    page = article_page(number)
+    filler = '<div class="ad"><!-- ' + 'x' * 1000 + ' --></div>'
+    return page.replace('</body>', filler * (HUGE_BYTES // len(filler)) + '</body>')
+
+class _CorpusHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = 'text/html; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.hits += 1
+        parts = self.path.strip('/').split('/')
+        kind, number = parts[0], int(parts[1].split('.')[0]) if len(parts) > 1 else 0
+        if kind == 'article':
+            self._send(200, article_page(number).encode())
+        elif kind == 'slow':
+            time.sleep(SLOW_DELAY)
+            self._send(200, article_page(number).encode())
+        elif kind == 'huge':
+            self._send(200, huge_page(number).encode())
+        elif kind == 'fail':
+            self._send(503, b'Service Unavailable', 'text/plain')
+        elif kind == 'pdf':
+            self._send(200, b'%PDF-1.4 ' + bytes(64 * 1024), 'application/pdf')
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+
+class _CorpusHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    hits = 0
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on huge pages once they have read enough
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class CorpusServer:
+    """Local publishers serving the corpus, one server (and host) each.
+
+    Requests go to ``<base>/<kind>/<number>``, where kind is one of the
+    FEED_MIX kinds.
+    """
+
+    def __init__(self, publishers: int = 4):
+        self.servers = [_CorpusHTTPServer(('127.0.0.1', 0), _CorpusHandler) for _ in range(publishers)]
+        self.threads = [threading.Thread(target=s.serve_forever, daemon=True) for s in self.servers]
+
+    @property
+    def bases(self) -> List[str]:
+        return [f"http://127.0.0.1:{s.server_address[1]}" for s in self.servers]
+
+    @property
+    def hits(self) -> int:
+        return sum(s.hits for s in self.servers)
+
+    def feed_urls(self, count: int, seed: int = 0) -> List[Tuple[str, str]]:
+        """(kind, url) pairs mixed per FEED_MIX and spread across publishers.
+
+        Failing pages all come from the last publisher, so its circuit opens
+        while the others keep working.
+        """
+        rng = random.Random(seed)
+        kinds = [kind for kind, share in FEED_MIX for _ in range(share)]
+        bases = self.bases
+        urls = []
+        for number in range(count):
+            kind = rng.choice(kinds)
+            base = bases[-1] if kind == 'fail' else bases[number % max(1, len(bases) - 1)]
+            suffix = '.pdf' if kind == 'pdf' else ''
+            urls.append((kind, f"{base}/{kind}/{seed * 100000 + number}{suffix}"))
+        return urls
+
+    def __enter__(self) -> 'CorpusServer':
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
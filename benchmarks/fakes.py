@@ -0,0 +1,48 @@
+"""Stand-in for the GNews client, feeding local corpus URLs."""
+import random
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+from urllib.parse import quote
+
+from arinja import news
+
+class FakeGNews:
+    """Answers get_news with entries shaped like GNews results.
+
+    URLs are wrapped in Google News redirects, as real results are, so
+    clean_google_url is exercised too.
+    """
+
+    urls: List[str] = []
+
+    def __init__(self, **kwargs):
+        self.country = kwargs.get('country')
+        self.language = kwargs.get('language')
+
+    def get_news(self, query: str) -> List[Dict]:
+        rng = random.Random(query)
+        return [
+            {
+                'title': f"{news_title(rng)} - Publisher {number % 7}",
+                'description': news_title(rng),
+                'published date': 'Mon, 06 Jan 2025 08:00:00 GMT',
+                'url': f"https://news.google.com/rss/articles/?url={quote(url, safe='')}",
+                'publisher': {'href': url.split('/')[2], 'title': f"Publisher {number % 7}"},
+            }
+            for number, url in enumerate(self.urls)
+        ]
+
+def news_title(rng: random.Random) -> str:
+    words = "markets rally as monsoon session opens with budget debate on rail growth".split()
+    return ' '.join(rng.choice(words) for _ in range(8)).capitalize()
+
+@contextmanager
+def fake_gnews(urls: List[str]) -> Iterator[None]:
+    """Make NewsSource query FakeGNews, returning ``urls``."""
+    original = news.GNews
+    FakeGNews.urls = urls
+    news.GNews = FakeGNews
+    try:
+        yield
+    finally:
+        news.GNews = original
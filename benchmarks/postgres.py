@@ -0,0 +1,99 @@
+"""Throwaway PostgreSQL databases for the storage and read benchmarks."""
+import os
+import runpy
+import shutil
+import subprocess
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from arinja import db
+
+INIT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'init_db.py')
+
+def _pg_bin(name: str) -> Optional[str]:
+    bindir = os.environ.get('PG_BINDIR')
+    if bindir:
+        return os.path.join(bindir, name)
+    return shutil.which(name)
+
+def _is_root() -> bool:
+    # initdb refuses to run as root
+    return hasattr(os, 'geteuid') and os.geteuid() == 0
+
+@contextmanager
+def _scratch_database(server_uri: str) -> Iterator[str]:
+    """Create a uniquely named database on an existing server, then drop it."""
+    name = f"arinja_bench_{uuid.uuid4().hex[:8]}"
+    admin = psycopg2.connect(server_uri)
+    admin.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    try:
+        with admin.cursor() as cur:
+            cur.execute(f'CREATE DATABASE "{name}"')
+        dsn = psycopg2.extensions.parse_dsn(server_uri)
+        dsn['dbname'] = name
+        yield psycopg2.extensions.make_dsn(**dsn)
+    finally:
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        admin.close()
+
+@contextmanager
+def _temporary_cluster() -> Iterator[str]:
+    """initdb a cluster in a temporary directory, listening on a socket only."""
+    data = tempfile.mkdtemp(prefix='arinja-bench-pg-')
+    try:
+        subprocess.run([_pg_bin('initdb'), '-D', data, '-U', 'postgres', '-A', 'trust'],
+                       check=True, capture_output=True)
+        subprocess.run([_pg_bin('pg_ctl'), '-D', data, '-w', '-l', os.path.join(data, 'log'),
+                        '-o', f"-h '' -k {data}", 'start'], check=True, capture_output=True)
+        try:
+            yield f"postgresql://postgres@/postgres?host={data}"
+        finally:
+            subprocess.run([_pg_bin('pg_ctl'), '-D', data, '-m', 'fast', 'stop'], capture_output=True)
+    finally:
+        shutil.rmtree(data, ignore_errors=True)
+
+@contextmanager
+def throwaway_postgres() -> Iterator[Optional[str]]:
+    """Yield the URI of an empty arinja database, or None if none can be made.
+
+    Uses a scratch database on the server at ARINJA_BENCH_POSTGRES_URI when
+    set, otherwise a temporary cluster from initdb/pg_ctl (on PATH or in
+    PG_BINDIR). The schema comes from scripts/init_db.py, partitioned by
+    month when ARINJA_BENCH_PARTITIONED is set, and arinja.db is pointed at
+    the database for the duration.
+    """
+    server_uri = os.environ.get('ARINJA_BENCH_POSTGRES_URI')
+    if server_uri:
+        source = _scratch_database(server_uri)
+    elif _pg_bin('initdb') and _pg_bin('pg_ctl') and not _is_root():
+        source = _temporary_cluster()
+    else:
+        yield None
+        return
+
+    with source as uri:
+        conn = psycopg2.connect(uri)
+        with conn, conn.cursor() as cur:
+            init_db = runpy.run_path(INIT_DB)
+            cur.execute(init_db['schema'])
+            if os.environ.get('ARINJA_BENCH_PARTITIONED') and init_db['partition_articles'](cur):
+                cur.execute(init_db['schema'])
+        conn.close()
+
+        previous = os.environ.get('POSTGRES_URI')
+        os.environ['POSTGRES_URI'] = uri
+        db.close_pool()
+        try:
+            yield uri
+        finally:
+            db.close_pool()
+            if previous is None:
+                os.environ.pop('POSTGRES_URI', None)
+            else:
+                os.environ['POSTGRES_URI'] = previous
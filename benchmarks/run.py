@@ -0,0 +1,92 @@
+"""Run the benchmarks and compare them with the stored baseline.
+
+    python -m benchmarks.run                  # compare with baseline.json
+    python -m benchmarks.run --save           # record a new baseline
+    python -m benchmarks.run --only extract   # run some benchmarks
+
+Metrics ending in ``_per_sec`` should not drop and metrics ending in
+``_ms`` should not rise by more than the tolerance; any that do are
+reported as regressions and the run exits with status 1. Other metrics
+are informational. Baselines are machine specific, so record one on the
+machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from typing import Dict, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from . import bench_extract, bench_fetch, bench_store
+
+BENCHMARKS = {
+    'extract': bench_extract.run,
+    'fetch': bench_fetch.run,
+    'store': bench_store.run,
+}
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+
+console = Console()
+
+def regression(name: str, value: float, baseline: Optional[float], tolerance: float) -> bool:
+    if baseline is None:
+        return False
+    if name.endswith('_per_sec'):
+        return value < baseline * (1 - tolerance)
+    if name.endswith('_ms'):
+        return value > baseline * (1 + tolerance)
+    return False
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run arinja benchmarks")
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help="Comma-separated benchmarks to run")
+    parser.add_argument('--save', action='store_true', help="Store the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown")
+    parser.add_argument('--baseline', default=BASELINE, help="Baseline JSON file")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, float] = {}
+    for name in args.only.split(','):
+        console.print(f"[dim]Running {name}...[/dim]")
+        results.update(BENCHMARKS[name]())
+
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['metrics']
+
+    table = Table(title="arinja benchmarks")
+    table.add_column("Metric")
+    table.add_column("Result", justify="right")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Change", justify="right")
+    regressions = []
+    for name, value in results.items():
+        previous = baseline.get(name)
+        change = f"{(value - previous) / previous:+.0%}" if previous else ""
+        if regression(name, value, previous, args.tolerance):
+            regressions.append(name)
+            change = f"[red]{change}[/red]"
+        table.add_row(name, f"{value:.2f}", f"{previous:.2f}" if previous is not None else "-", change)
+    console.print(table)
+
+    if args.save:
+        merged = dict(baseline, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                       'cpus': os.cpu_count(), 'metrics': merged}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        console.print(f"[green]Saved baseline to {args.baseline}[/green]")
+        return 0
+
+    if regressions:
+        console.print(f"[red]Regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}[/red]")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 import psycopg2
@@ -7,21 +8,12 @@ from dotenv import load_dotenv
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 config_env = os.path.join(project_root, 'config', 'config.env')
 
-if not os.path.exists(config_env):
-    print(f"Error: config.env not found at {config_env}")
-    print("Please copy config.example.env to config.env and update the values.")
-    sys.exit(1)
-
-load_dotenv(dotenv_path=config_env)
-POSTGRES_URI = os.getenv('POSTGRES_URI')
-
 schema = '''
 CREATE TABLE IF NOT EXISTS articles (
     id SERIAL PRIMARY KEY,
     title TEXT NOT NULL,
     source TEXT,
     published_at TIMESTAMP,
-    content TEXT,
     category TEXT,
     url TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -29,15 +21,196 @@ CREATE TABLE IF NOT EXISTS articles (
 );
 CREATE INDEX IF NOT EXISTS articles_category_idx ON articles(category);
 CREATE INDEX IF NOT EXISTS articles_published_at_idx ON articles(published_at);
+-- Dedup key used by store_articles: one article per title, source and day.
+-- A partitioned table has one per partition instead (see arinja_ensure_partitions)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'articles'::regclass) THEN
+        CREATE UNIQUE INDEX IF NOT EXISTS articles_dedup_idx ON articles(title, source, (published_at::date));
+    END IF;
+END $$;
+-- Lets fetch skip downloading articles that are already stored
+CREATE INDEX IF NOT EXISTS articles_url_idx ON articles(url);
+-- Keyset pagination of listings, newest first (see db.LISTING_KEY)
+CREATE INDEX IF NOT EXISTS articles_category_listing_idx
+    ON articles(category, (COALESCE(published_at, '-infinity'::timestamp)) DESC, id DESC);
+CREATE INDEX IF NOT EXISTS articles_listing_idx
+    ON articles((COALESCE(published_at, '-infinity'::timestamp)) DESC, id DESC);
+
+-- Article bodies, stored once per distinct text under its SHA-256. Postgres
+-- compresses bodies over about 2kB, with ARINJA_BODY_COMPRESSION if set
+CREATE TABLE IF NOT EXISTS article_bodies (
+    hash BYTEA PRIMARY KEY,
+    content TEXT NOT NULL
+);
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS body_hash BYTEA;
+-- Why an article has no body: ok, no_content, http_error (with
+-- http_status), timeout, connection_error, host_skipped, unsupported, error
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS fetch_status TEXT NOT NULL DEFAULT 'ok';
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS http_status SMALLINT;
+
+-- Full-text search over title (weighted higher) and body, filled in by
+-- store_articles (db.SEARCH_VECTOR); it used to be generated from content
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE articles ALTER COLUMN search_vector DROP EXPRESSION IF EXISTS;
+CREATE INDEX IF NOT EXISTS articles_search_idx ON articles USING GIN (search_vector);
+
+-- Near-duplicate clustering (see arinja/fingerprint.py): MinHash signature
+-- of the body, its LSH band keys for candidate lookup, and the cluster,
+-- named after the id of its first article
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS minhash BIGINT[];
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS lsh_bands INTEGER[];
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS cluster_id INTEGER;
+-- Without fastupdate, lookups need not scan a pending list of new rows
+CREATE INDEX IF NOT EXISTS articles_lsh_bands_idx ON articles USING GIN (lsh_bands) WITH (fastupdate = off);
+-- Newest article per cluster, for collapsed listings
+CREATE INDEX IF NOT EXISTS articles_cluster_idx
+    ON articles(cluster_id, (COALESCE(published_at, '-infinity'::timestamp)) DESC, id DESC);
+
+-- Move bodies out of databases created before article_bodies existed,
+-- turning placeholder text into fetch statuses
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'articles' AND column_name = 'content'
+    ) THEN
+        UPDATE articles SET content = NULL, fetch_status = 'no_content'
+            WHERE content = 'Article content could not be retrieved. Please check the source URL.';
+        UPDATE articles SET content = NULL, fetch_status = 'error'
+            WHERE content LIKE 'Error fetching article: %';
+        -- Databases from before search had no search_vector; same as db.SEARCH_VECTOR
+        UPDATE articles SET search_vector =
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B');
+        INSERT INTO article_bodies (hash, content)
+            SELECT sha256(convert_to(content, 'UTF8')), content FROM articles
+            WHERE content IS NOT NULL
+            ON CONFLICT DO NOTHING;
+        UPDATE articles SET body_hash = sha256(convert_to(content, 'UTF8'))
+            WHERE content IS NOT NULL;
+        ALTER TABLE articles DROP COLUMN content;
+    END IF;
+END $$;
+
+-- Creates the monthly partitions (articles_YYYY_MM) holding the given
+-- publication times; returns false if articles is not partitioned. A day
+-- never spans two partitions, so a dedup index per partition still keeps
+-- one article per title, source and day.
+CREATE OR REPLACE FUNCTION arinja_ensure_partitions(days TIMESTAMP[]) RETURNS BOOLEAN AS $$
+DECLARE
+    month DATE;
+    name TEXT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'articles'::regclass) THEN
+        RETURN FALSE;
+    END IF;
+    FOR month IN SELECT DISTINCT date_trunc('month', day)::date FROM unnest(days) AS day WHERE day IS NOT NULL LOOP
+        name := 'articles_' || to_char(month, 'YYYY_MM');
+        IF to_regclass(name) IS NULL THEN
+            -- Concurrent writers wait for the first one's partition
+            PERFORM pg_advisory_xact_lock(hashtext(name));
+            IF to_regclass(name) IS NULL THEN
+                EXECUTE format('CREATE TABLE %I PARTITION OF articles FOR VALUES FROM (%L) TO (%L)',
+                               name, month, month + INTERVAL '1 month');
+                EXECUTE format('CREATE UNIQUE INDEX %I ON %I (title, source, (published_at::date))',
+                               name || '_dedup_idx', name);
+            END IF;
+        END IF;
+    END LOOP;
+    RETURN TRUE;
+END
+$$ LANGUAGE plpgsql;
+
+-- Finished windows of `arinja fetch --backfill`, so interrupted runs resume
+CREATE TABLE IF NOT EXISTS fetch_checkpoints (
+    category TEXT NOT NULL,
+    window_start DATE NOT NULL,
+    window_end DATE NOT NULL,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (category, window_start, window_end)
+);
+
+-- Start time of the last successful undated fetch per category; later
+-- fetches only ask GNews for what was published since
+CREATE TABLE IF NOT EXISTS fetch_watermarks (
+    category TEXT PRIMARY KEY,
+    fetched_until TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 '''
 
+def partition_articles(cur):
+    """Rebuild articles as a table range-partitioned by month of published_at.
+
+    Rows are copied into monthly partitions in the current transaction;
+    undated articles are filed under the time they were stored. Run the
+    schema again afterwards to create the indexes.
+    """
+    cur.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'articles'::regclass")
+    if cur.fetchone():
+        return False
+
+    cur.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'articles'
+        ORDER BY ordinal_position
+    """)
+    columns = [row[0] for row in cur.fetchall()]
+    cur.execute("SELECT pg_get_serial_sequence('articles', 'id')")
+    sequence = cur.fetchone()[0]
+    select = ', '.join(
+        "COALESCE(published_at, created_at, LOCALTIMESTAMP)" if column == 'published_at' else column
+        for column in columns
+    )
+    cur.execute(f"""
+        LOCK TABLE articles IN ACCESS EXCLUSIVE MODE;
+        ALTER TABLE articles RENAME TO articles_unpartitioned;
+        CREATE TABLE articles (LIKE articles_unpartitioned INCLUDING DEFAULTS INCLUDING STORAGE)
+            PARTITION BY RANGE (published_at);
+        ALTER TABLE articles ALTER COLUMN published_at SET NOT NULL;
+        SELECT arinja_ensure_partitions(array_agg(COALESCE(published_at, created_at, LOCALTIMESTAMP)))
+            FROM articles_unpartitioned;
+        INSERT INTO articles ({', '.join(columns)}) SELECT {select} FROM articles_unpartitioned;
+        ALTER SEQUENCE {sequence} OWNED BY articles.id;
+        DROP TABLE articles_unpartitioned;
+        ALTER TABLE articles ADD PRIMARY KEY (id, published_at);
+    """)
+    return True
+
 def main():
-    if not POSTGRES_URI:
+    parser = argparse.ArgumentParser(description="Create or upgrade the arinja database schema")
+    parser.add_argument('--partition', action='store_true',
+                        help="Partition articles by month of publication, migrating existing rows")
+    args = parser.parse_args()
+    
+    if not os.path.exists(config_env):
+        print(f"Error: config.env not found at {config_env}")
+        print("Please copy config.example.env to config.env and update the values.")
+        sys.exit(1)
+    
+    load_dotenv(dotenv_path=config_env)
+    postgres_uri = os.getenv('POSTGRES_URI')
+    if not postgres_uri:
         print("POSTGRES_URI not set in .env")
         return
-    conn = psycopg2.connect(POSTGRES_URI)
+    conn = psycopg2.connect(postgres_uri)
     cur = conn.cursor()
     cur.execute(schema)
+    if args.partition and partition_articles(cur):
+        # Indexes of the old table went with it
+        cur.execute(schema)
+        # Autovacuum never analyzes partitioned parents
+        cur.execute("ANALYZE articles")
+        print("Partitioned the articles table by month.")
+    # Optional compression method for article bodies (pglz or lz4)
+    compression = os.getenv('ARINJA_BODY_COMPRESSION')
+    if compression:
+        if compression not in ('pglz', 'lz4'):
+            print(f"ARINJA_BODY_COMPRESSION must be pglz or lz4, not {compression!r}")
+            sys.exit(1)
+        cur.execute(f"ALTER TABLE article_bodies ALTER COLUMN content SET COMPRESSION {compression}")
     conn.commit()
     cur.close()
     conn.close()
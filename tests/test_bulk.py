@@ -0,0 +1,41 @@
+import io
+
+import pytest
+
+from arinja import bulk
+
+
+def test_resolve_format_from_file_name():
+    assert bulk.resolve_format('articles.csv') == ('csv', False)
+    assert bulk.resolve_format('articles.jsonl.gz') == ('jsonl', True)
+    assert bulk.resolve_format('articles.gz', 'csv') == ('csv', True)
+    with pytest.raises(ValueError):
+        bulk.resolve_format('articles.xml', 'xml')
+
+
+def test_csv_import_keeps_records_and_quoting():
+    exported = (
+        'id,title,content\n'
+        '1,First,"Two\nlines, and ""quotes"""\n'
+        '2,Empty body,""\n'
+        '3,No body,\n'
+    )
+    chunks = list(bulk._csv_import_chunks(io.StringIO(exported, newline=''), chunk_size=2, skip=0))
+    assert [(columns, records) for columns, records, _ in chunks] == [(['id', 'title', 'content'], 2), (['id', 'title', 'content'], 1)]
+    assert chunks[0][2] == '1,First,"Two\nlines, and ""quotes"""\n2,Empty body,""\n'
+    assert chunks[1][2] == '3,No body,\n'
+
+    resumed = list(bulk._csv_import_chunks(io.StringIO(exported, newline=''), chunk_size=2, skip=2))
+    assert [text for _, _, text in resumed] == ['3,No body,\n']
+
+    with pytest.raises(ValueError):
+        list(bulk._csv_import_chunks(io.StringIO('id,headline\n1,x\n'), chunk_size=2, skip=0))
+
+
+def test_jsonl_import_writes_nulls_unquoted():
+    lines = '{"id": 7, "title": "A \\"B\\"", "content": "", "minhash": [1, 2]}\n\n{"title": "C"}\n'
+    chunks = list(bulk._jsonl_import_chunks(io.StringIO(lines), chunk_size=10, skip=0))
+    assert len(chunks) == 1 and chunks[0][1] == 2
+    first, second = chunks[0][2].splitlines()
+    assert first == '7,"A ""B""",,,"",,,,"{1,2}",,,,'
+    assert second == ',"C",,,,,,,,,,,'
@@ -3,3 +3,12 @@ import subprocess
 def test_cli_help():
     result = subprocess.run(["poetry", "run", "python", "-m", "arinja.cli", "--help"], capture_output=True, text=True)
     assert "Arinja" in result.stdout
+
+def test_parse_age():
+    import datetime
+    from arinja import cli
+
+    now = datetime.datetime.now()
+    assert abs(cli._parse_age('2w') - (now - datetime.timedelta(days=14))) < datetime.timedelta(minutes=1)
+    year_ago = cli._parse_age('1y')
+    assert (year_ago.year, year_ago.month, year_ago.day) == (now.year - 1, now.month, 1)
@@ -0,0 +1,219 @@
+import datetime
+import os
+import random
+import runpy
+
+import psycopg2
+import pytest
+
+from arinja import bulk, db, extract, fingerprint
+from benchmarks.postgres import INIT_DB, throwaway_postgres
+
+# The articles table before bodies, statuses and search were added
+BASELINE_SCHEMA = """
+    CREATE TABLE articles (
+        id SERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        source TEXT,
+        published_at TIMESTAMP,
+        content TEXT,
+        category TEXT,
+        url TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(title, source, published_at)
+    )
+"""
+
+WORDS = "the council voted on tuesday to approve a revised budget for the city transport network".split()
+
+
+@pytest.fixture(scope='module', params=['plain', 'partitioned'])
+def database(request):
+    """A throwaway arinja database, once per table layout."""
+    previous = os.environ.get('ARINJA_BENCH_PARTITIONED')
+    if request.param == 'partitioned':
+        os.environ['ARINJA_BENCH_PARTITIONED'] = '1'
+    else:
+        os.environ.pop('ARINJA_BENCH_PARTITIONED', None)
+    try:
+        with throwaway_postgres() as uri:
+            if uri is None:
+                pytest.skip("no PostgreSQL available (set ARINJA_BENCH_POSTGRES_URI)")
+            yield uri
+    finally:
+        if previous is None:
+            os.environ.pop('ARINJA_BENCH_PARTITIONED', None)
+        else:
+            os.environ['ARINJA_BENCH_PARTITIONED'] = previous
+
+
+@pytest.fixture
+def conn(database):
+    conn = psycopg2.connect(database)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE articles, article_bodies")
+    yield conn
+    conn.close()
+
+
+def body(seed, words=80):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+
+def article(n, category='world', published_at=datetime.datetime(2025, 3, 10, 8), **fields):
+    return dict({
+        'title': f"Story {n}", 'source': 'Wire', 'published_at': published_at,
+        'content': body(n), 'category': category, 'url': f"https://example.com/{n}"
+    }, **fields)
+
+
+def test_store_returns_ids_in_input_order_and_resolves_duplicates(conn):
+    first = db.store_articles([article(1), article(2)])
+    assert len(first) == 2 and first[0] < first[1]
+
+    again = db.store_articles([
+        article(3),
+        article(1, published_at=datetime.datetime(2025, 3, 10, 22)),
+        article(3),
+        article(4, published_at=None),
+    ])
+    assert again[1] == first[0] and again[2] == again[0]
+    assert len(set(again)) == 3 and min(again[0], again[3]) > first[1]
+    assert db.get_article_by_id(again[0])['content'] == body(3)
+    assert db.find_stored([article(2), article(5), article(6, url=article(4)['url'])]) == [True, False, True]
+
+
+def test_stored_articles_are_not_fingerprinted_again(conn, monkeypatch):
+    first = db.store_articles([article(1), article(2)])
+    signed = []
+    signature = fingerprint.signature
+    monkeypatch.setattr(fingerprint, 'signature', lambda text: signed.append(text) or signature(text))
+    ids = db.store_articles([article(2), article(3), article(3)])
+    assert signed == [body(3)]
+    assert ids[0] == first[1] and ids[1] == ids[2] > first[1]
+
+
+def test_store_raises_instead_of_dropping_id_collisions(conn):
+    db.ensure_partitions(conn, [datetime.datetime(2025, 3, 10)])
+    with conn.cursor() as cur:
+        # A row ahead of the sequence, as an interrupted import could leave
+        cur.execute("""
+            INSERT INTO articles (id, title, source, published_at, category, url)
+            SELECT nextval(pg_get_serial_sequence('articles', 'id')) + 1,
+                   'Imported', 'Wire', '2025-03-10 08:00', 'world', 'https://example.com/imported'
+        """)
+    with pytest.raises((psycopg2.IntegrityError, RuntimeError)):
+        db.store_articles([article(1), article(2), article(3)])
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM articles")
+        assert cur.fetchone()[0] == 1
+
+
+def test_listings_page_with_cursors_and_search_ranks_matches(conn):
+    ids = db.store_articles([
+        article(n, category='sports' if n % 2 else 'world',
+                published_at=datetime.datetime(2025, 1, 1) + datetime.timedelta(days=n * 9))
+        for n in range(10)
+    ])
+    sports = [i for n, i in enumerate(ids) if n % 2][::-1]
+
+    page = db.get_articles('sports', limit=3)
+    rest = db.get_articles('sports', limit=3, before=db.make_cursor(page[-1]))
+    assert [a['id'] for a in page + rest] == sports[:5]
+    march = db.get_articles(from_date=datetime.datetime(2025, 3, 1), to_date=datetime.datetime(2025, 3, 31))
+    assert {a['published_at'].month for a in march} == {3} and len(march) == 3
+
+    db.store_articles([article(20, title="Tram fares frozen", content="Tram fares frozen. " + body(20))])
+    results = db.search_articles('tram fares')
+    assert results[0]['title'] == "Tram fares frozen"
+    assert db.HIGHLIGHT_START in results[0]['snippet']
+
+
+def test_prune_deletes_old_months_and_their_bodies(conn):
+    old, new = datetime.datetime(2025, 1, 15), datetime.datetime(2025, 3, 15)
+    ids = db.store_articles([
+        article(1, published_at=old),
+        article(2, published_at=new),
+        article(3, published_at=None),
+        # Same body as the pruned article, so it must survive
+        article(4, published_at=new, content=body(1)),
+    ])
+
+    removed = db.prune_articles(datetime.datetime(2025, 2, 20))
+    assert removed['articles'] == 1 and removed['bodies'] == 0
+    assert db.get_article_by_id(ids[0]) is None
+    assert [db.get_article_by_id(i)['content'] for i in ids[1:]] == [body(2), body(3), body(1)]
+
+    db.prune_articles(datetime.datetime(2025, 4, 1))
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM article_bodies")
+        assert cur.fetchone()[0] == 1
+
+
+def test_import_renumbers_taken_ids_and_reports_skipped_rows(conn, tmp_path):
+    ids = db.store_articles([article(1), article(2, content=body(1))])
+    path = str(tmp_path / 'articles.jsonl')
+    assert bulk.export_articles(path) == 2
+
+    # Another database whose articles have the same ids
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE articles, article_bodies")
+    others = db.store_articles([article(3), article(4)])
+    with conn.cursor() as cur:
+        cur.execute("UPDATE articles SET id = id - %s + %s", (min(others), min(ids)))
+
+    result = bulk.import_articles(path)
+    assert result == bulk.ImportResult({'world': 2}, 0, 2)
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, cluster_id FROM articles WHERE title IN ('Story 1', 'Story 2') ORDER BY title")
+        (first, first_cluster), (second, second_cluster) = cur.fetchall()
+    assert first not in ids and second not in ids
+    # The copy still belongs to the renumbered original's cluster
+    assert first_cluster == second_cluster == first
+
+    again = bulk.import_articles(path)
+    assert again == bulk.ImportResult({}, 2, 0)
+
+
+def test_interrupted_import_leaves_the_sequence_past_imported_ids(conn, tmp_path):
+    ids = db.store_articles([article(n) for n in range(1, 4)])
+    path = str(tmp_path / 'articles.jsonl')
+    bulk.export_articles(path)
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE articles, article_bodies")
+        cur.execute("SELECT setval(pg_get_serial_sequence('articles', 'id'), 1, false)")
+    with open(path, 'a') as f:
+        f.write("not json\n")
+
+    with pytest.raises(ValueError):
+        bulk.import_articles(path, chunk_size=3)
+    new = db.store_articles([article(n) for n in range(4, 7)])
+    assert len(new) == 3 and min(new) > max(ids)
+
+
+def test_upgrade_from_baseline_moves_bodies_and_indexes_them(monkeypatch):
+    monkeypatch.delenv('ARINJA_BENCH_PARTITIONED', raising=False)
+    with throwaway_postgres() as uri:
+        if uri is None:
+            pytest.skip("no PostgreSQL available (set ARINJA_BENCH_POSTGRES_URI)")
+        conn = psycopg2.connect(uri)
+        with conn, conn.cursor() as cur:
+            cur.execute("DROP TABLE articles, article_bodies")
+            cur.execute(BASELINE_SCHEMA)
+            cur.executemany(
+                "INSERT INTO articles (title, source, published_at, content, category, url) "
+                "VALUES (%s, 'Wire', '2025-03-10 08:00', %s, 'world', %s)",
+                [("Story one", "The council voted to approve a revised budget.", "https://example.com/1"),
+                 ("Budget talks stall", extract.NO_CONTENT, "https://example.com/2")]
+            )
+            cur.execute(runpy.run_path(INIT_DB)['schema'])
+        conn.close()
+
+        found = db.search_articles('budget')
+        assert sorted(a['title'] for a in found) == ["Budget talks stall", "Story one"]
+        assert db.search_articles('retrieved') == []
+        stored = {a['title']: a for a in found}
+        assert db.get_article_by_id(stored["Story one"]['id'])['content'].startswith("The council")
+        assert db.get_article_by_id(stored["Budget talks stall"]['id'])['fetch_status'] == 'no_content'
@@ -0,0 +1,31 @@
+import random
+
+from arinja import fingerprint
+
+WORDS = "the minister said on monday that the new rail project would cost more than planned".split()
+
+
+def story(seed, words=300):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+
+def test_near_duplicates_are_similar_and_share_a_band():
+    original = story(1)
+    words = original.split()
+    words[150:160] = "a sentence the syndicating publisher rewrote in its own house style".split()
+    syndicated = "By Staff Reporter. " + ' '.join(words) + " Copyright 2025."
+
+    a, b = fingerprint.signature(original), fingerprint.signature(syndicated)
+    assert fingerprint.similarity(a, b) >= fingerprint.THRESHOLD
+    assert set(fingerprint.bands(a)) & set(fingerprint.bands(b))
+    assert fingerprint.similarity(a, fingerprint.signature(story(2))) < fingerprint.THRESHOLD
+
+
+def test_signatures_fit_postgres_columns_and_skip_short_text():
+    signature = fingerprint.signature(story(3, words=40))
+    assert len(signature) == fingerprint.SLOTS
+    assert all(0 <= value < (1 << 63) for value in signature)
+    assert all(-(1 << 31) <= key < (1 << 31) for key in fingerprint.bands(signature))
+    assert fingerprint.signature("Article content could not be retrieved.") is None
+    assert fingerprint.signature(None) is None
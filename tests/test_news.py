@@ -0,0 +1,222 @@
+import datetime
+import importlib.util
+import time
+
+import pytest
+import requests
+
+from arinja import extract, news
+from arinja.metrics import Metrics
+from arinja.pagecache import PageCache
+from arinja.readcache import ReadCache
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200, headers=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def close(self):
+        pass
+
+
+def article_html(text):
+    return f"<html><body><article><p>{text} {'x' * 120}</p></article></body></html>"
+
+
+class FakeClient:
+    def read_html(self, response):
+        return response.text
+
+    def get_html(self, url, headers=None):
+        response = self.get(url, headers)
+        ok = response.status_code < 400 and response.status_code != 304
+        return response, self.read_html(response) if ok else None
+
+    def get(self, url, headers=None, stream=False):
+        # Later URLs answer first to shuffle completion order
+        time.sleep(0.05 / int(url.rsplit('/', 1)[1]))
+        return FakeResponse(article_html(url))
+
+
+class ETagClient(FakeClient):
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get('If-None-Match') == '"v1"':
+            return FakeResponse('', status_code=304)
+        return FakeResponse(article_html('cached'), headers={'ETag': '"v1"'})
+
+
+def test_fetch_contents_keeps_order():
+    urls = [f"https://example{i % 2}.com/{i}" for i in range(1, 9)]
+
+    serial = news.NewsSource(workers=1, client=FakeClient()).fetch_contents(urls)
+    concurrent = news.NewsSource(workers=4, client=FakeClient()).fetch_contents(urls)
+
+    assert concurrent == serial
+    assert [result.content.split()[0] for result in concurrent] == urls
+
+
+class FailingClient(FakeClient):
+    def get(self, url, headers=None, stream=False):
+        page = url.rsplit('/', 1)[1]
+        if page == 'missing':
+            return FakeResponse('', status_code=404)
+        if page == 'slow':
+            raise requests.Timeout("timed out")
+        return FakeResponse("<html><body><p>Too short to be article text.</p></body></html>")
+
+
+def test_fetch_failures_become_statuses():
+    metrics = Metrics()
+    source = news.NewsSource(workers=1, client=FailingClient(), metrics=metrics)
+    results = source.fetch_contents([f"https://example.com/{page}" for page in ('missing', 'slow', 'empty')])
+
+    assert results == [
+        news.FetchResult(None, news.FETCH_HTTP_ERROR, 404),
+        news.FetchResult(None, news.FETCH_TIMEOUT),
+        news.FetchResult(None, news.FETCH_NO_CONTENT),
+    ]
+    assert metrics.counters == {'download_errors': 2, 'extract_empty': 1}
+
+
+def test_metrics_record_stages_and_host_latency():
+    metrics = Metrics()
+    source = news.NewsSource(workers=2, client=FakeClient(), metrics=metrics)
+    source.fetch_contents([f"https://example.com/{i}" for i in range(1, 5)])
+
+    data = metrics.snapshot()
+    assert data['stages']['download']['calls'] == 4
+    assert data['stages']['extract']['calls'] == 4
+    host = data['hosts']['example.com']
+    assert host['count'] == host['buckets']['+Inf'] == 4
+    assert host['buckets']['0.05'] <= host['buckets']['0.1'] <= 4
+
+    text = metrics.to_prometheus()
+    assert 'arinja_fetch_stage_calls{stage="download"} 4' in text
+    assert 'arinja_fetch_host_request_seconds_count{host="example.com"} 4' in text
+
+
+def test_page_cache_serves_fresh_and_revalidates_stale(tmp_path):
+    url = "https://example.com/story"
+    client = ETagClient()
+
+    cache = PageCache(path=str(tmp_path / 'pages.db'))
+    source = news.NewsSource(client=client, cache=cache)
+    first = source.fetch_article_content(url)
+    assert source.fetch_article_content(url) == first
+    assert len(client.requests) == 1
+
+    stale = PageCache(path=str(tmp_path / 'pages.db'), fresh_for=0)
+    assert news.NewsSource(client=client, cache=stale).fetch_article_content(url) == first
+    assert client.requests[-1]['If-None-Match'] == '"v1"'
+    assert stale.stats['revalidated'] == 1
+
+
+def test_page_cache_evicts_over_size(tmp_path):
+    cache = PageCache(path=str(tmp_path / 'pages.db'), max_bytes=10)
+    cache.put("https://example.com/old", "a" * 8)
+    cache.put("https://example.com/new", "b" * 8)
+    cache.evict()
+    assert cache.get("https://example.com/old") is None
+    assert cache.get("https://example.com/new").content == "b" * 8
+
+
+def test_read_cache_serves_articles_and_invalidates_listings(tmp_path):
+    cache = ReadCache(path=str(tmp_path / 'reads.db'), listing_ttl=60)
+    article = {
+        'id': 7, 'title': "Title", 'source': "Source", 'published_at': datetime.datetime(2025, 1, 2, 3, 4),
+        'content': "Body", 'category': 'sports', 'url': "https://example.com/a",
+        'fetch_status': 'ok', 'http_status': None
+    }
+    cache.put_articles([dict(article, extra="ignored")])
+    assert cache.get_article(7) == article
+    
+    cache.put_listing('sports', 20, None, [article])
+    assert cache.get_listing('sports', 20, None)[0]['published_at'] == article['published_at']
+    assert cache.get_listing('sports', 10, None) is None
+    assert cache.get_listing('sports', 20, None, collapse=True) is None
+    cache.put_listing('sports', 20, None, [dict(article, duplicates=2)], collapse=True)
+    
+    cache.invalidate_listings(['sports'])
+    assert cache.get_listing('sports', 20, None, stale_ok=True) is None
+    assert cache.get_listing('sports', 20, None, stale_ok=True, collapse=True) is None
+
+    cache.forget_articles(datetime.datetime(2025, 1, 2))
+    assert cache.get_article(7) is not None
+    cache.forget_articles(datetime.datetime(2025, 2, 1))
+    assert cache.get_article(7) is None
+
+
+def test_detect_category_matches_whole_words():
+    matcher = news.CategoryMatcher(news.CATEGORY_KEYWORDS)
+    assert matcher.detect("Airline fares rise", "Travel demand in the city") == 'general'
+    assert matcher.detect("New apps for students", "") == 'technology'
+    assert matcher.detect("Stock markets rally", "AI shares lead") == 'technology'
+    assert matcher.detect("Lok  Sabha session", "") == 'india'
+    assert matcher.detect_many([("Cricket final", ""), ("Statement issued", "")]) == ['sports', 'general']
+    assert matcher.detect("Wines of the valley", "A visitor stares at the vines") == 'general'
+    assert matcher.detect("Team wins the cup", "") == 'sports'
+    assert matcher.detect("Festival stars", "") == 'entertainment'
+
+
+def test_custom_keyword_table(tmp_path):
+    path = tmp_path / 'keywords.json'
+    path.write_text('{"climate": ["monsoon", "heatwave"], "technology": ["ai"]}')
+    matcher = news.CategoryMatcher(news.load_category_keywords(str(path)))
+    assert matcher.detect("AI forecasts monsoon", "") == 'climate'
+
+
+def test_extract_text_stops_after_first_container():
+    paragraph = 'y' * 150
+    html = (
+        f"<html><body><article><p>{paragraph}</p></article>"
+        f"<article><p>{'z' * 150}</p></article>" + "<div>junk</div>" * 1000 + "</body></html>"
+    )
+    assert extract.trim_to_container(html).endswith('</article>')
+    assert extract.extract_text(html) == paragraph
+    assert extract.extract_text(f"<main><p>{paragraph}</p><p>{paragraph}</p></main>", max_chars=100) == paragraph
+
+
+def test_custom_elements_are_not_containers():
+    paragraph = 'y' * 150
+    html = (
+        "<html><body><main-nav><a href='/'>Home</a></main-nav>"
+        f"<div class='story-body'><p>{paragraph}</p></div></body></html>"
+    )
+    assert extract.trim_to_container(html) == html
+    assert extract.extract_text(html) == paragraph
+    assert extract.trim_to_container(f"<ARTICLE class='x'><p>a</p></article >{paragraph}").endswith('</article >')
+
+
+def test_unusable_parsers_fail_up_front():
+    assert extract.resolve_parser('html.parser') == 'html.parser'
+    assert extract.resolve_parser('auto') in ('lxml', 'html.parser')
+    with pytest.raises(ValueError, match="Unknown parser"):
+        extract.Extractor(parser='lxmll')
+    if importlib.util.find_spec('lxml') is None:
+        with pytest.raises(ValueError, match="not installed"):
+            extract.Extractor(parser='lxml')
+
+
+def test_containers_in_removed_tags_do_not_cut_the_page():
+    paragraph = 'y' * 150
+    story = f"<p>{paragraph}</p>"
+    pages = [
+        f"<body><aside><article>related</article></aside><article>{story}</article></body>",
+        f"<body><nav><article>menu</article></nav><div class='story'>{story}</div></body>",
+        f"<body><script>var s = '<main>x</main>';</script><div class='story'>{story}</div></body>",
+        f"<body><!-- <main>x</main> --><div class='story'>{story}</div></body>",
+    ]
+    for html in pages:
+        assert extract.extract_text(html) == paragraph
+    nested = f"<article><aside><article>related</article></aside>{story}</article><div>junk</div>"
+    assert extract.trim_to_container(nested).endswith(f"{story}</article>")
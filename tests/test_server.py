@@ -0,0 +1,90 @@
+import datetime
+import threading
+
+import pytest
+import requests
+
+from arinja import db, server
+
+
+def test_listing_cache_expires_evicts_and_invalidates():
+    cache = server.ListingCache(ttl=60, max_entries=2)
+    token = cache.token()
+    cache.put('a', 'sports', b'1', token)
+    cache.put('b', 'world', b'2', token)
+    assert cache.get('a') == b'1'
+    # 'b' is now least recently used
+    cache.put('c', None, b'3', token)
+    assert cache.get('b') is None and len(cache) == 2
+
+    cache.invalidate(['sports'])
+    # Listings across all categories go with any category
+    assert cache.get('a') is None and cache.get('c') is None
+    # A page loaded before the change is not cached
+    cache.put('a', 'sports', b'old', token)
+    assert cache.get('a') is None
+    assert cache.stats == {'hits': 1, 'misses': 4, 'invalidations': 1}
+
+    cache.put('d', 'world', b'4', cache.token())
+    cache.ttl = 0
+    cache.put('e', 'world', b'5', cache.token())
+    assert cache.get('d') == b'4' and cache.get('e') is None
+
+
+@pytest.fixture
+def api(monkeypatch):
+    calls = []
+    published = datetime.datetime(2025, 10, 18, 9, 30)
+
+    def get_articles(category, from_date, to_date, limit, before, collapse):
+        calls.append((category, from_date, to_date, limit, before, collapse))
+        return [{'id': 10 - i, 'title': f"t{i}", 'published_at': published, 'category': category}
+                for i in range(limit)]
+
+    def get_article_by_id(article_id):
+        if article_id != 7:
+            return None
+        return {'id': 7, 'title': 'Seven', 'source': 'Wire', 'url': 'https://example.com/7',
+                'published_at': published, 'content': 'Body ✓', 'fetch_status': 'ok'}
+
+    monkeypatch.setattr(db, 'get_articles', get_articles)
+    monkeypatch.setattr(db, 'get_article_by_id', get_article_by_id)
+    httpd = server.ApiServer(('127.0.0.1', 0), ['sports', 'world'], server.ListingCache())
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", httpd, calls
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_listing_pages_are_cached_until_invalidated(api):
+    url, httpd, calls = api
+    with requests.Session() as session:
+        page = session.get(f"{url}/articles?category=Sports&limit=2&to=2025-10-19").json()
+        assert [a['id'] for a in page['articles']] == [10, 9]
+        assert page['articles'][0]['published_at'] == '2025-10-18T09:30:00'
+        assert page['next'] == '2025-10-18T09:30:00_9'
+        assert calls == [('sports', None, datetime.datetime(2025, 10, 19, 23, 59, 59), 2, None, False)]
+
+        session.get(f"{url}/articles?category=sports&limit=2&to=2025-10-19")
+        assert len(calls) == 1
+        httpd.cache.invalidate(['world'])
+        session.get(f"{url}/articles?category=sports&limit=2&to=2025-10-19")
+        assert len(calls) == 1
+        httpd.cache.invalidate(['sports'])
+        session.get(f"{url}/articles?category=sports&limit=2&to=2025-10-19")
+        assert len(calls) == 2
+
+
+def test_articles_sources_and_errors(api):
+    url, _, _ = api
+    article = requests.get(f"{url}/articles/7").json()
+    assert article['content'] == 'Body ✓' and article['published_at'] == '2025-10-18T09:30:00'
+    assert requests.get(f"{url}/articles/7/source").json() == {
+        'id': 7, 'source': 'Wire', 'url': 'https://example.com/7'
+    }
+    assert requests.get(f"{url}/articles/8").status_code == 404
+    assert requests.get(f"{url}/nothing").status_code == 404
+    for query in ('category=golf', 'limit=0', 'from=19-10-2025', 'before=nope'):
+        response = requests.get(f"{url}/articles?{query}")
+        assert response.status_code == 400 and response.json()['error']
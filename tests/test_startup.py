@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+from arinja import cli, extract, news, pipeline, web
+
+# Generous ceiling for `import arinja.cli`; most of it is typer and rich
+IMPORT_BUDGET_MS = float(os.environ.get('ARINJA_IMPORT_BUDGET_MS', 500))
+HEAVY_MODULES = ['gnews', 'bs4', 'requests', 'psycopg2', 'pytz']
+
+RUN_CLI = """
+import sys
+from arinja.cli import app
+sys.argv = ['arinja'] + sys.argv[1:]
+try:
+    app()
+except SystemExit:
+    pass
+print('loaded:', *sorted(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def run_cli(tmp_path, *args):
+    env = dict(os.environ, ARINJA_CACHE_DIR=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, "-c", RUN_CLI.format(heavy=HEAVY_MODULES), *args],
+        capture_output=True, text=True, env=env
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.splitlines()[-1].split()[1:]
+
+
+def test_read_commands_skip_fetch_stack(tmp_path):
+    assert run_cli(tmp_path) == []
+    assert run_cli(tmp_path, "--offline", "1") == []
+    assert run_cli(tmp_path, "--offline", "technology") == []
+    assert run_cli(tmp_path, "--offline", "source", "1") == []
+
+
+def test_import_time_budget():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import arinja.cli"],
+        capture_output=True, text=True
+    )
+    total_us = next(
+        int(line.split('|')[1])
+        for line in result.stderr.splitlines()
+        if line.split('|')[-1].strip() == 'arinja.cli'
+    )
+    assert total_us / 1000 < IMPORT_BUDGET_MS
+
+
+def test_fetch_option_defaults_match():
+    assert cli.DEFAULT_WORKERS == news.DEFAULT_WORKERS
+    assert cli.DEFAULT_PER_HOST == news.DEFAULT_PER_HOST
+    assert cli.DEFAULT_EXTRACT_PROCS == extract.DEFAULT_PROCESSES
+    assert cli.DEFAULT_PARSER == extract.DEFAULT_PARSER
+    assert cli.DEFAULT_MAX_PAGE_KB * 1024 == web.DEFAULT_MAX_BYTES
+    assert cli.DEFAULT_CHUNK_SIZE == pipeline.DEFAULT_CHUNK_SIZE
+    assert cli.DEFAULT_WINDOW_DAYS == pipeline.DEFAULT_WINDOW_DAYS
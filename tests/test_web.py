@@ -0,0 +1,129 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from arinja import web
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    calls = {}
+
+    def do_GET(self):
+        count = self.calls.get(self.path, 0)
+        self.calls[self.path] = count + 1
+        # /flaky fails once, /down always fails
+        status = 503 if self.path == '/down' or (self.path == '/flaky' and count == 0) else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FlakyHandler.calls = {}
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_retries_then_succeeds(server):
+    client = web.HttpClient(backoff=0)
+    assert client.get(f"{server}/flaky").status_code == 200
+    assert client.stats['retries'] == 1
+
+
+def test_circuit_opens_after_repeated_failures(server):
+    client = web.HttpClient(backoff=0, max_retries=1, failure_threshold=2)
+    for _ in range(2):
+        assert client.get(f"{server}/down").status_code == 503
+    with pytest.raises(web.CircuitOpenError):
+        client.get(f"{server}/ok")
+    assert client.stats['trips'] == 1
+    assert client.stats['skipped'] == 1
+    assert FlakyHandler.calls == {'/down': 4}
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content_type, body = {
+            '/big': ('text/html; charset=utf-8', b'<p>' + b'x' * 5000 + b'</p>'),
+            '/pdf': ('application/pdf', b'%PDF-1.4'),
+        }[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_read_html_caps_size_and_rejects_non_html():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    try:
+        client = web.HttpClient(max_bytes=1000)
+        assert len(client.read_html(client.get(f"{base}/big", stream=True))) == 1000
+        with pytest.raises(web.UnsupportedContentError):
+            client.read_html(client.get(f"{base}/pdf", stream=True))
+        assert client.stats['truncated'] == 1
+        assert client.stats['rejected'] == 1
+    finally:
+        httpd.shutdown()
+
+
+class SlowBodyHandler(BaseHTTPRequestHandler):
+    active = 0
+    most = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.most = max(cls.most, cls.active)
+        try:
+            status = 404 if self.path == '/missing' else 200
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', '4')
+            self.end_headers()
+            self.wfile.flush()
+            time.sleep(0.1)
+            self.wfile.write(b'<p/>')
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def test_get_html_holds_the_host_slot_while_reading():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowBodyHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    try:
+        client = web.HttpClient(per_host=1)
+        threads = [threading.Thread(target=client.get_html, args=(f"{base}/page",)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert SlowBodyHandler.most == 1
+
+        response, text = client.get_html(f"{base}/missing")
+        assert response.status_code == 404 and text is None
+        assert client.get_html(f"{base}/page")[1] == '<p/>'
+    finally:
+        httpd.shutdown()